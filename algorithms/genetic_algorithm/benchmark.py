@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import numpy as np
+
+from typing import List, Dict
+from functools import partial
+from problem import Problem, Placement
+from optimizer import Configuration, Optimizer, evaluate
+from benchmarks import DATA, dataset_paths
+
+"""
+Throughput suite of the placement engine and the genetic algorithm. Run from this directory:
+- python benchmark.py suite --output results.json: throughput suite on the dataset and on generated instances.
+- python benchmark.py compare baseline.json results.json: flag regressions of a suite run against a saved baseline.
+Without instance paths, the instances in data/dataset are used. Benchmarks of single features are in the benchmarks package.
+
+For each instance, the suite measures:
+- decode: Placement.decode latency.
+- evaluate: Placement.evaluate latency (mean / p95) and evaluations per second.
+- choose / update: latency of Bin.choose and Bin.update calls during the evaluations.
+- generation: time of one full Optimizer generation (partition, mating, mutation and evaluation).
+- memory: peak memory traced during one evaluation, and the EMS list sizes at the end of the evaluations.
+"""
+
+# Metrics compared against a baseline, and whether higher values are better
+TRACKED_METRICS = {
+    'decode_mean_ms': False,
+    'evaluate_mean_ms': False,
+    'evaluate_p95_ms': False,
+    'evaluations_per_s': True,
+    'choose_mean_us': False,
+    'update_mean_us': False,
+    'generation_s': False,
+    'peak_memory_kb': False
+}
+
+def generated_paths(directory: str, n_items: List[int] = (50, 200, 1000), n_bins: List[int] = (1, 10), seed: int = 0) -> List[str]:
+    """
+    Generate one instance per (n_items, n_bins) pair with data/generator.Generator and return their paths.
+    """
+    sys.path.insert(0, DATA)
+    from generator import Generator
+
+    paths = []
+    for items in n_items:
+        for bins in n_bins:
+            path = os.path.join(directory, f'{items}_{bins}_{seed}.dat')
+            if not os.path.exists(path):
+                Generator(items, bins, seed=seed, bin_size=[100, 100, 100], filename=path).generate()
+            paths.append(path)
+    return paths
+
+def time_bin_calls(problem: Problem, solution: np.ndarray, **kwargs) -> Dict[str, List[float]]:
+    """
+    Evaluate a solution while timing every Bin.choose and Bin.update call.
+    """
+    placement = Placement(problem, **kwargs)
+    Bin = placement.Bin
+    timings = {'choose': [], 'update': []}
+
+    def timed(name, method):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = method(*args, **kwargs)
+            timings[name].append(time.perf_counter() - start)
+            return result
+        return wrapper
+
+    choose, update = Bin.choose, Bin.update
+    Bin.choose, Bin.update = timed('choose', choose), timed('update', update)
+    try:
+        placement.evaluate(solution)
+    finally:
+        Bin.choose, Bin.update = choose, update
+    return timings
+
+def time_generation(problem: Problem, n_individuals: int, seed: int, **kwargs) -> float:
+    """
+    Time one full generation of the optimizer after the initial population has been evaluated.
+    """
+    objective_function = partial(evaluate, problem=problem, **kwargs)
+    config = Configuration(objective_function, problem.total_items, n_individuals, max(1, n_individuals // 10), 1, 0.5, 0.3, problem, population='matrix')
+    population = Optimizer(config, seed=seed).population
+    population.initialize()
+    start = time.perf_counter()
+    population.partition()
+    population.next_generation(population.mating(), population.mutation())
+    return time.perf_counter() - start
+
+def benchmark_instance(path: str, n_solutions: int = 5, n_individuals: int = 10, seed: int = 0, **kwargs) -> Dict[str, float]:
+    problem = Problem(path)
+    solutions = np.random.default_rng(seed).random((n_solutions, 2 * problem.total_items))
+
+    decode_times, evaluate_times, EMS_sizes = [], [], []
+    for solution in solutions:
+        placement = Placement(problem, **kwargs)
+        start = time.perf_counter()
+        placement.decode(solution)
+        decode_times.append(time.perf_counter() - start)
+
+        placement = Placement(problem, **kwargs)
+        start = time.perf_counter()
+        placement.evaluate(solution)
+        evaluate_times.append(time.perf_counter() - start)
+        EMS_sizes += [bin.n_EMSs for bin in placement.bins]
+
+    timings = time_bin_calls(problem, solutions[0], **kwargs)
+
+    tracemalloc.start()
+    Placement(problem, **kwargs).evaluate(solutions[0])
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'n_items': problem.total_items,
+        'decode_mean_ms': 1e3 * float(np.mean(decode_times)),
+        'evaluate_mean_ms': 1e3 * float(np.mean(evaluate_times)),
+        'evaluate_p95_ms': 1e3 * float(np.percentile(evaluate_times, 95)),
+        'evaluations_per_s': float(len(evaluate_times) / np.sum(evaluate_times)),
+        'choose_mean_us': 1e6 * float(np.mean(timings['choose'])),
+        'update_mean_us': 1e6 * float(np.mean(timings['update'])),
+        'generation_s': time_generation(problem, n_individuals, seed, **kwargs),
+        'peak_memory_kb': peak_memory / 1024,
+        'EMS_mean': float(np.mean(EMS_sizes)),
+        'EMS_max': int(np.max(EMS_sizes))
+    }
+
+def run_suite(paths: List[str], output: str = None, **kwargs) -> dict:
+    """
+    Run the suite on every instance, print a summary line per instance and optionally save the results to a JSON file.
+    """
+    results = {
+        'meta': {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'options': {key: value for key, value in kwargs.items() if isinstance(value, (int, float, str))}
+        },
+        'instances': {}
+    }
+    for path in paths:
+        metrics = benchmark_instance(path, **kwargs)
+        results['instances'][os.path.basename(path)] = metrics
+        print(f'{os.path.basename(path)}: {metrics["evaluations_per_s"]:.2f} evaluations/s | '
+              f'evaluate {metrics["evaluate_mean_ms"]:.1f} ms (p95 {metrics["evaluate_p95_ms"]:.1f}) | '
+              f'choose {metrics["choose_mean_us"]:.0f} us | update {metrics["update_mean_us"]:.0f} us | '
+              f'generation {metrics["generation_s"]:.2f} s | peak {metrics["peak_memory_kb"]:.0f} KB | '
+              f'EMSs {metrics["EMS_mean"]:.1f} (max {metrics["EMS_max"]})')
+
+    if output:
+        with open(output, 'w') as file:
+            json.dump(results, file, indent=2)
+    return results
+
+def compare_results(baseline: dict, results: dict, threshold: float = 0.1) -> List[str]:
+    """
+    Return a description of every tracked metric that is worse than the baseline by more than the threshold (relative).
+    """
+    regressions = []
+    for instance, metrics in results['instances'].items():
+        if instance not in baseline['instances']:
+            continue
+        for metric, higher_is_better in TRACKED_METRICS.items():
+            old, new = baseline['instances'][instance].get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(f'{instance} {metric}: {old:.4g} -> {new:.4g} ({100 * change:+.1f}%)')
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Throughput suite of the placement engine and the genetic algorithm')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    suite = commands.add_parser('suite', help='Run the throughput suite')
+    suite.add_argument('paths', nargs='*', help='Instances (default: data/dataset and generated instances)')
+    suite.add_argument('--output', help='JSON file to save the results to')
+    suite.add_argument('--instances', default=os.path.join(tempfile.gettempdir(), 'bpp_benchmark'), help='Directory of the generated instances')
+    suite.add_argument('--n-items', type=int, nargs='+', default=[50, 200, 1000])
+    suite.add_argument('--n-bins', type=int, nargs='+', default=[1, 10])
+    suite.add_argument('--n-solutions', type=int, default=5)
+    suite.add_argument('--backend', default='array', choices=list(Placement.backends))
+    suite.add_argument('--update-mode', default='difference', choices=list(Placement.update_modes))
+
+    compare = commands.add_parser('compare', help='Flag regressions against a saved baseline')
+    compare.add_argument('baseline')
+    compare.add_argument('results')
+    compare.add_argument('--threshold', type=float, default=0.1, help='Relative change counted as a regression')
+
+    args = parser.parse_args()
+    if args.command == 'suite':
+        paths = args.paths
+        if not paths:
+            os.makedirs(args.instances, exist_ok=True)
+            paths = dataset_paths() + generated_paths(args.instances, args.n_items, args.n_bins)
+        run_suite(paths, args.output, n_solutions=args.n_solutions, backend=args.backend, update_mode=args.update_mode)
+    else:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        with open(args.results) as file:
+            results = json.load(file)
+        regressions = compare_results(baseline, results, args.threshold)
+        for regression in regressions:
+            print(f'Regression: {regression}')
+        print(f'{len(regressions)} regression(s) above {100 * args.threshold:.0f}%')
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,24 @@
+import os
+from typing import List
+
+"""
+Benchmarks of single features of the placement engine and the genetic algorithm, one module per feature.
+Run them from the genetic_algorithm directory, e.g. python -m benchmarks.workers:
+- backends [instance.dat ...]: list against array Bin backends, and split against difference EMS update modes.
+- populations: GA bookkeeping of the list and matrix populations.
+- workers [instance.dat]: generations per second against the number of evaluation workers.
+- bin_skipping [instance.dat ...]: decode time and skipped bins and EMS checks for several open-bin caps.
+- instance_generator: time the instance generator.
+- online_latency: per-item latency of the online packer as items stream in.
+- placement_rules [instance.dat ...]: decode throughput and bin counts of each placement rule.
+- warm_start [instance.dat ...]: time to target of the GA seeded by sweepbox against random initialization.
+- local_search [instance.dat ...]: final fitness and time of the GA with and without local search on its elites.
+- solution_export [instance.dat ...]: time to build, export (binary and CSV) and validate the solution array.
+Without instance paths, the instances in data/dataset are used. The throughput suite is in benchmark.py.
+"""
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'data')
+DATASET = os.path.join(DATA, 'dataset')
+
+def dataset_paths() -> List[str]:
+    return sorted(os.path.join(DATASET, name) for name in os.listdir(DATASET) if name.endswith('.dat'))
@@ -0,0 +1,67 @@
+import os
+import time
+import argparse
+import numpy as np
+
+from typing import List, Tuple
+from problem import Problem, Placement
+from benchmarks import dataset_paths
+
+"""
+Benchmarks of the Bin backends and of the EMS update modes. Run from the genetic_algorithm directory:
+- python -m benchmarks.backends [instance.dat ...]
+"""
+
+def time_decodes(problem: Problem, solutions: np.ndarray, **kwargs) -> Tuple[float, List[List[List[Tuple[int]]]]]:
+    """
+    Decode every solution with a fresh Placement and return the mean time per decode and the resulting placements.
+    """
+    placements = []
+    start = time.perf_counter()
+    for solution in solutions:
+        placement = Placement(problem, **kwargs)
+        placement.evaluate(solution)
+        placements.append([bin.items for bin in placement.bins])
+    return (time.perf_counter() - start) / len(solutions), placements
+
+def compare_backends(paths: List[str], n_solutions: int = 50, seed: int = 0) -> None:
+    """
+    Compare the list-based and array-based Bin backends on the same random chromosomes.
+    """
+    for path in paths:
+        problem = Problem(path)
+        solutions = np.random.default_rng(seed).random((n_solutions, 2 * problem.total_items))
+        list_time, list_placements = time_decodes(problem, solutions, backend='list')
+        array_time, array_placements = time_decodes(problem, solutions, backend='array')
+        if list_placements != array_placements:
+            raise AssertionError(f'Backends disagree on {path}')
+        print(f'{os.path.basename(path)}: list {1e3 * list_time:.2f} ms | array {1e3 * array_time:.2f} ms | '
+              f'speedup x{list_time / array_time:.2f}')
+
+def compare_update_modes(paths: List[str], n_solutions: int = 50, seed: int = 0, backend: str = 'array') -> None:
+    """
+    Compare the 'split' and 'difference' EMS update modes on the same random chromosomes.
+    - Reports the mean and best number of used bins and the evaluation throughput of each mode.
+    """
+    for path in paths:
+        problem = Problem(path)
+        solutions = np.random.default_rng(seed).random((n_solutions, 2 * problem.total_items))
+        for update_mode in Placement.update_modes:
+            used_bins = []
+            start = time.perf_counter()
+            for solution in solutions:
+                placement = Placement(problem, backend=backend, update_mode=update_mode)
+                placement.evaluate(solution)
+                used_bins.append(placement.used_bins)
+            elapsed = time.perf_counter() - start
+            print(f'{os.path.basename(path)} | {update_mode:>10}: mean bins {np.mean(used_bins):.2f} | '
+                  f'best bins {np.min(used_bins)} | {n_solutions / elapsed:.1f} evaluations/s')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare the Bin backends and the EMS update modes')
+    parser.add_argument('paths', nargs='*')
+    parser.add_argument('--n-solutions', type=int, default=50)
+    args = parser.parse_args()
+    paths = args.paths or dataset_paths()
+    compare_backends(paths, args.n_solutions)
+    compare_update_modes(paths, args.n_solutions)
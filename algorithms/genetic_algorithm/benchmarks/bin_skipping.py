@@ -0,0 +1,42 @@
+import os
+import time
+import argparse
+import numpy as np
+
+from typing import List
+from problem import Problem, Placement
+from benchmarks import dataset_paths
+
+"""
+Benchmark of the bin summaries. Run from the genetic_algorithm directory:
+- python -m benchmarks.bin_skipping [instance.dat ...]: decode time and skipped bins and EMS checks for several open-bin caps.
+"""
+
+def benchmark_bin_skipping(paths: List[str], caps: List[int] = (None, 1, 3), n_solutions: int = 10, seed: int = 0, **kwargs) -> None:
+    """
+    Report decode time, used bins and the bins and EMS checks skipped by the bin summaries for several open-bin caps.
+    """
+    for path in paths:
+        problem = Problem(path)
+        solutions = np.random.default_rng(seed).random((n_solutions, 2 * problem.total_items))
+        for cap in caps:
+            placements = [Placement(problem, max_open_bins=cap, **kwargs) for _ in solutions]
+            start = time.perf_counter()
+            for placement, solution in zip(placements, solutions):
+                placement.evaluate(solution)
+            elapsed = (time.perf_counter() - start) / n_solutions
+            print(f'{os.path.basename(path)} | open bins {str(cap or "all"):>3}: {1e3 * elapsed:.1f} ms | '
+                  f'mean bins {np.mean([placement.used_bins for placement in placements]):.2f} | '
+                  f'skipped {np.mean([placement.skipped_bins for placement in placements]):.1f} bins, '
+                  f'{np.mean([placement.skipped_EMSs for placement in placements]):.1f} EMS checks per decode')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bins and EMS checks skipped for several open-bin caps')
+    parser.add_argument('paths', nargs='*')
+    parser.add_argument('--caps', nargs='+', default=['all', '1', '3'], help='Open-bin caps (all: no cap)')
+    parser.add_argument('--n-solutions', type=int, default=10)
+    parser.add_argument('--backend', default='array', choices=list(Placement.backends))
+    parser.add_argument('--update-mode', default='difference', choices=list(Placement.update_modes))
+    args = parser.parse_args()
+    caps = [None if cap == 'all' else int(cap) for cap in args.caps]
+    benchmark_bin_skipping(args.paths or dataset_paths(), caps, args.n_solutions, backend=args.backend, update_mode=args.update_mode)
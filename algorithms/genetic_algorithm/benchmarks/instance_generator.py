@@ -0,0 +1,38 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+
+from typing import List
+from benchmarks import DATA
+
+"""
+Benchmark of the instance generator of data/generator.py. Run from the genetic_algorithm directory:
+- python -m benchmarks.instance_generator
+"""
+
+def benchmark_generator(n_items: List[int] = (100, 500, 1000), n_bins: int = 1, repeats: int = 5) -> None:
+    """
+    Time data/generator.Generator on one bin of each number of items (files are written to a temporary directory).
+    """
+    sys.path.insert(0, DATA)
+    from generator import Generator
+
+    with tempfile.TemporaryDirectory() as directory:
+        for items in n_items:
+            times = []
+            for seed in range(repeats):
+                generator = Generator(items, n_bins, seed=seed, filename=os.path.join(directory, f'{items}_{n_bins}_{seed}.dat'))
+                start = time.perf_counter()
+                generator.generate()
+                times.append(time.perf_counter() - start)
+            print(f'Generator | {items} items x {n_bins} bins: {1e3 * np.mean(times):.2f} ms')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time the instance generator')
+    parser.add_argument('--n-items', type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument('--n-bins', type=int, default=1)
+    args = parser.parse_args()
+    benchmark_generator(args.n_items, args.n_bins)
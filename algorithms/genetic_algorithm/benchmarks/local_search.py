@@ -0,0 +1,64 @@
+import os
+import time
+import argparse
+import numpy as np
+
+from typing import List
+from functools import partial
+from problem import Problem
+from optimizer import Configuration, Optimizer, evaluate
+from localsearch import LocalSearch
+from benchmarks import dataset_paths
+
+"""
+Benchmark of the local search. Run from the genetic_algorithm directory:
+- python -m benchmarks.local_search [instance.dat ...]: final fitness and time of the GA with and without local search on its elites.
+"""
+
+def benchmark_local_search(path: str,
+                           n_elites: int = 2,
+                           max_moves: int = 50,
+                           seconds: float = None,
+                           seeds: List[int] = (0, 1, 2),
+                           n_individuals: int = 30,
+                           n_generations: int = 20,
+                           backend: str = 'array',
+                           update_mode: str = 'difference') -> None:
+    """
+    Compare the GA without and with local search on its n_elites best individuals, over the same seeds.
+    - Reports the mean final fitness and run time, the moves tried and accepted, and the share of items repacked per move
+      (the rest are resumed from snapshots).
+    """
+    for polish in (False, True):
+        finals, times, stats = [], [], []
+        for seed in seeds:
+            problem = Problem(path)
+            objective_function = partial(evaluate, problem=problem, backend=backend, update_mode=update_mode)
+            local_search = LocalSearch(problem, n_elites, max_moves, seconds, backend=backend, update_mode=update_mode) if polish else None
+            config = Configuration(objective_function, problem.total_items, n_individuals, max(1, n_individuals // 10), n_generations,
+                                   0.5, 0.3, problem, population='matrix', early_stop=False, local_search=local_search)
+            start = time.perf_counter()
+            Optimizer(config, seed=seed).optimize()
+            times.append(time.perf_counter() - start)
+            finals.append(problem.best_fitness)
+            if polish:
+                stats.append(local_search.stats())
+
+        line = f'{os.path.basename(path)} | {"local search" if polish else "GA only":>12}: mean final fitness {np.mean(finals):.4f} | {np.mean(times):.2f} s per run'
+        if polish:
+            mean = {key: np.mean([run[key] for run in stats]) for key in stats[0]}
+            line += (f' | per run: {mean["moves"]:.0f} moves, {mean["accepted"]:.1f} accepted, {mean["time_s"]:.2f} s in local search | '
+                     f'{100 * mean["repacked_items_per_move"] / Problem(path).total_items:.0f}% of items repacked per move')
+        print(line)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='GA with and without local search on its elites')
+    parser.add_argument('paths', nargs='*')
+    parser.add_argument('--n-elites', type=int, default=2, help='Individuals polished per generation')
+    parser.add_argument('--max-moves', type=int, default=50, help='Moves tried per generation')
+    parser.add_argument('--seconds', type=float, default=None, help='Time spent in local search per generation')
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0, 1, 2])
+    parser.add_argument('--n-generations', type=int, default=20)
+    args = parser.parse_args()
+    for path in args.paths or dataset_paths():
+        benchmark_local_search(path, args.n_elites, args.max_moves, args.seconds, args.seeds, n_generations=args.n_generations)
@@ -0,0 +1,44 @@
+import argparse
+import numpy as np
+
+from typing import Tuple
+from online import OnlinePacker
+
+"""
+Benchmark of the online packer. Run from the genetic_algorithm directory:
+- python -m benchmarks.online_latency: per-item latency of the online packer as items stream in.
+"""
+
+def benchmark_online(n_items: int = 20000,
+                     block: int = 2000,
+                     bin_size: Tuple[int] = (100, 100, 100),
+                     item_sizes: Tuple[int] = (10, 50),
+                     max_open_bins: int = 4,
+                     policy: str = 'oldest',
+                     seed: int = 0) -> None:
+    """
+    Stream random items through the online packer and report the latency of each block of items.
+    - Latency should stay flat over the blocks: the work per item does not depend on the number of items placed.
+    """
+    rng = np.random.default_rng(seed)
+    items = [tuple(item) for item in rng.integers(item_sizes[0], item_sizes[1] + 1, size=(n_items, 3)).tolist()]
+    packer = OnlinePacker(bin_size, max_open_bins, policy, min_size=item_sizes[0], window=n_items)
+    for _ in packer.pack(items):
+        pass
+
+    latencies = 1e6 * packer.latencies[:n_items]
+    for start in range(0, n_items, block):
+        latency = latencies[start:start + block]
+        print(f'Online | items {start:>6}-{start + len(latency) - 1:>6}: mean {latency.mean():.0f} us | '
+              f'p99 {np.percentile(latency, 99):.0f} us | max {latency.max():.0f} us')
+    stats = packer.stats()
+    print(f'Online | {stats["items"]} items in {stats["used_bins"]} bins ({max_open_bins} open, {policy}) | '
+          f'p50 {stats["p50_us"]:.0f} us | p99 {stats["p99_us"]:.0f} us')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Per-item latency of the online packer')
+    parser.add_argument('--n-items', type=int, default=20000)
+    parser.add_argument('--max-open-bins', type=int, default=4)
+    parser.add_argument('--policy', default='oldest', choices=list(OnlinePacker.policies))
+    args = parser.parse_args()
+    benchmark_online(args.n_items, max_open_bins=args.max_open_bins, policy=args.policy)
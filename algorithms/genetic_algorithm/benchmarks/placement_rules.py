@@ -0,0 +1,42 @@
+import os
+import time
+import argparse
+import numpy as np
+
+from typing import List
+from problem import Problem, Placement
+from rules import EMS_RULES, BIN_RULES
+from benchmarks import dataset_paths
+
+"""
+Benchmark of the placement rules. Run from the genetic_algorithm directory:
+- python -m benchmarks.placement_rules [instance.dat ...]: decode throughput and bin counts of each placement rule.
+"""
+
+def compare_rules(paths: List[str], n_solutions: int = 20, seed: int = 0, backend: str = 'array', update_mode: str = 'difference') -> None:
+    """
+    Compare every (EMS rule, bin rule) pair on the same random chromosomes.
+    - Reports the mean and best number of used bins, the mean fitness and the evaluation throughput of each pair.
+    """
+    for path in paths:
+        problem = Problem(path)
+        solutions = np.random.default_rng(seed).random((n_solutions, 2 * problem.total_items))
+        for EMS_rule in EMS_RULES:
+            for bin_rule in BIN_RULES:
+                used_bins, fitnesses = [], []
+                start = time.perf_counter()
+                for solution in solutions:
+                    placement = Placement(problem, backend=backend, update_mode=update_mode, EMS_rule=EMS_rule, bin_rule=bin_rule)
+                    fitnesses.append(placement.evaluate(solution))
+                    used_bins.append(placement.used_bins)
+                elapsed = time.perf_counter() - start
+                print(f'{os.path.basename(path)} | {EMS_rule:>12} + {bin_rule:<9}: mean bins {np.mean(used_bins):.2f} | '
+                      f'best bins {np.min(used_bins)} | mean fitness {np.mean(fitnesses):.3f} | {n_solutions / elapsed:.1f} evaluations/s')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare the placement rules')
+    parser.add_argument('paths', nargs='*')
+    parser.add_argument('--n-solutions', type=int, default=20)
+    parser.add_argument('--update-mode', default='difference', choices=list(Placement.update_modes))
+    args = parser.parse_args()
+    compare_rules(args.paths or dataset_paths(), args.n_solutions, update_mode=args.update_mode)
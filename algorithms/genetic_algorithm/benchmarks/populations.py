@@ -0,0 +1,35 @@
+import time
+import argparse
+import numpy as np
+
+from optimizer import Configuration, Population, MatrixPopulation
+
+"""
+Benchmark of the GA bookkeeping of the population representations. Run from the genetic_algorithm directory:
+- python -m benchmarks.populations
+"""
+
+def benchmark_populations(n_items: int = 1000, n_individuals: int = 100, n_generations: int = 10, seed: int = 0) -> None:
+    """
+    Time the GA bookkeeping (partition, mating, mutation) of both population representations.
+    - A trivial objective function is used so that decoding does not dominate the measurement.
+    """
+    for population_class in (Population, MatrixPopulation):
+        config = Configuration(lambda chromosome: float(np.sum(chromosome)), n_items, n_individuals, n_individuals // 10, n_generations, 0.5, 0.3)
+        population = population_class(config, rng=np.random.RandomState(seed))
+        population.initialize()
+        start = time.perf_counter()
+        for _ in range(n_generations):
+            population.partition()
+            population.next_generation(population.mating(), population.mutation())
+        elapsed = time.perf_counter() - start
+        print(f'{population_class.__name__:>16}: {1e3 * elapsed / n_generations:.2f} ms per generation '
+              f'({n_items} items, {n_individuals} individuals)')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time the GA bookkeeping of the list and matrix populations')
+    parser.add_argument('--n-items', type=int, default=1000)
+    parser.add_argument('--n-individuals', type=int, default=100)
+    parser.add_argument('--n-generations', type=int, default=10)
+    args = parser.parse_args()
+    benchmark_populations(args.n_items, args.n_individuals, args.n_generations)
@@ -0,0 +1,50 @@
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+
+from problem import Problem, Placement
+from benchmarks import dataset_paths
+import solutions
+
+"""
+Benchmark of the solution array. Run from the genetic_algorithm directory:
+- python -m benchmarks.solution_export [instance.dat ...]: time to build, export (binary and CSV) and validate the solution array.
+"""
+
+def benchmark_solution(path: str, repeats: int = 20, seed: int = 0, backend: str = 'array', update_mode: str = 'difference') -> None:
+    """
+    Time the solution array of one decoded random solution: building it from the bins (done on each improvement),
+    writing it as binary and CSV, and validating it.
+    """
+    problem = Problem(path)
+    placement = Placement(problem, backend=backend, update_mode=update_mode)
+    placement.evaluate(np.random.default_rng(seed).random(2 * problem.total_items))
+
+    def timed(function) -> float:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            function()
+        return 1e3 * (time.perf_counter() - start) / repeats
+
+    solution = placement.solution()
+    with tempfile.TemporaryDirectory() as directory:
+        times = {
+            'build': timed(placement.solution),
+            'binary': timed(lambda: solutions.save_binary(solution, os.path.join(directory, 'solution.bin'), problem.bin_size)),
+            'CSV': timed(lambda: solutions.save_csv(solution, os.path.join(directory, 'solution.csv'))),
+            'validate': timed(lambda: solutions.validate(solution, problem.bin_size, problem.item_array))
+        }
+    violations = solutions.validate(solution, problem.bin_size, problem.item_array)
+    print(f'{os.path.basename(path)} | {len(solution)} items in {placement.used_bins} bins | ' +
+          ' | '.join(f'{name} {elapsed:.2f} ms' for name, elapsed in times.items()) +
+          f' | {len(violations)} violation(s)')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build, export and validate the solution array')
+    parser.add_argument('paths', nargs='*')
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+    for path in args.paths or dataset_paths():
+        benchmark_solution(path, args.repeats)
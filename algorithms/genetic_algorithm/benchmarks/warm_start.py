@@ -0,0 +1,71 @@
+import os
+import time
+import argparse
+import numpy as np
+
+from typing import List
+from functools import partial
+from problem import Problem
+from optimizer import Configuration, Optimizer, evaluate
+from callbacks import MetricsRecorder
+from sweepbox import SweepBox
+from benchmarks import dataset_paths
+
+"""
+Benchmark of the sweepbox warm start. Run from the genetic_algorithm directory:
+- python -m benchmarks.warm_start [instance.dat ...]: time to target of the GA seeded by sweepbox against random initialization.
+"""
+
+def time_to_target(path: str,
+                   seed_fractions: List[float] = (0.0, 0.1),
+                   seeds: List[int] = (0, 1, 2),
+                   n_individuals: int = 30,
+                   n_generations: int = 20,
+                   backend: str = 'array',
+                   update_mode: str = 'difference') -> None:
+    """
+    Compare the GA with random initialization (seed fraction 0) and with sweepbox chromosomes seeding part of the population.
+    - The target is the best final fitness of the randomly initialized runs: the time at which each run first reaches it is
+      reported, with the number of runs that reach it at all.
+    - The time to target of a seeded run includes the time spent building its heuristic chromosomes.
+    """
+    runs = {}
+    for seed_fraction in seed_fractions:
+        for seed in seeds:
+            problem = Problem(path)
+            start = time.perf_counter()
+            initial_chromosomes = SweepBox(problem, backend=backend, update_mode=update_mode).chromosomes() if seed_fraction else None
+            setup = time.perf_counter() - start
+            problem.best_fitness = np.inf # The sweeps are evaluated again in the initial population
+
+            objective_function = partial(evaluate, problem=problem, backend=backend, update_mode=update_mode)
+            config = Configuration(objective_function, problem.total_items, n_individuals, max(1, n_individuals // 10), n_generations,
+                                   0.5, 0.3, problem, population='matrix', early_stop=False,
+                                   initial_chromosomes=initial_chromosomes, seed_fraction=seed_fraction)
+            recorder = MetricsRecorder()
+            Optimizer(config, seed=seed, callbacks=[recorder]).optimize()
+            runs[seed_fraction, seed] = [(setup + row['elapsed_s'], row['generation'], row['best_fitness']) for row in recorder.rows]
+
+    target = min(runs[seed_fractions[0], seed][-1][2] for seed in seeds)
+    print(f'{os.path.basename(path)} | target fitness {target:.4f}')
+    for seed_fraction in seed_fractions:
+        reached, finals = [], []
+        for seed in seeds:
+            hits = [(elapsed, generation) for elapsed, generation, fitness in runs[seed_fraction, seed] if fitness <= target]
+            if hits:
+                reached.append(hits[0])
+            finals.append(runs[seed_fraction, seed][-1][2])
+        timing = f'time to target {np.mean([t for t, _ in reached]):.2f} s at generation {np.mean([g for _, g in reached]):.1f}' if reached else 'target not reached'
+        print(f'{os.path.basename(path)} | seed fraction {seed_fraction:.2f}: {timing} (reached by {len(reached)}/{len(seeds)} runs) | '
+              f'mean final fitness {np.mean(finals):.4f}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time to target with and without sweepbox seeding')
+    parser.add_argument('paths', nargs='*')
+    parser.add_argument('--seed-fractions', type=float, nargs='+', default=[0.0, 0.1])
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0, 1, 2])
+    parser.add_argument('--n-individuals', type=int, default=30)
+    parser.add_argument('--n-generations', type=int, default=20)
+    args = parser.parse_args()
+    for path in args.paths or dataset_paths():
+        time_to_target(path, args.seed_fractions, args.seeds, args.n_individuals, args.n_generations)
@@ -0,0 +1,46 @@
+import os
+import time
+import argparse
+
+from typing import List
+from functools import partial
+from problem import Problem
+from optimizer import Configuration, Optimizer, evaluate
+from benchmarks import dataset_paths
+
+"""
+Benchmark of the evaluation executors. Run from the genetic_algorithm directory:
+- python -m benchmarks.workers [instance.dat]: generations per second against the number of evaluation workers.
+"""
+
+def benchmark_workers(path: str,
+                      worker_counts: List[int] = (1, 2, 4, 8),
+                      executor: str = 'process',
+                      n_generations: int = 5,
+                      n_individuals: int = 100,
+                      chunk_size: int = 4,
+                      seed: int = 0) -> None:
+    """
+    Report generations per second of the optimizer against the number of evaluation workers.
+    """
+    for n_workers in [0] + list(worker_counts):
+        problem = Problem(path)
+        objective_function = partial(evaluate, problem=problem, backend='array')
+        config = Configuration(objective_function, problem.total_items, n_individuals, n_individuals // 10, n_generations, 0.5, 0.3, problem,
+                               executor=executor if n_workers else 'serial', n_workers=n_workers or None, chunk_size=chunk_size)
+        start = time.perf_counter()
+        Optimizer(config, seed=seed).optimize()
+        elapsed = time.perf_counter() - start
+        label = f'{executor} x{n_workers}' if n_workers else 'serial'
+        print(f'{os.path.basename(path)} | {label:>12}: {n_generations / elapsed:.2f} generations/s | best fitness {problem.best_fitness}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generations per second against the number of evaluation workers')
+    parser.add_argument('path', nargs='?', help='Instance (default: the first instance of data/dataset)')
+    parser.add_argument('--worker-counts', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--executor', default='process', choices=['thread', 'process'])
+    parser.add_argument('--n-generations', type=int, default=5)
+    parser.add_argument('--n-individuals', type=int, default=100)
+    parser.add_argument('--chunk-size', type=int, default=4)
+    args = parser.parse_args()
+    benchmark_workers(args.path or dataset_paths()[0], args.worker_counts, args.executor, args.n_generations, args.n_individuals, args.chunk_size)
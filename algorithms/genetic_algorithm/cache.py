@@ -0,0 +1,96 @@
+import sys
+import numpy as np
+from threading import Lock
+from collections import OrderedDict
+from typing import List, Callable, Optional
+from problem import Placement
+
+"""
+Many random-key chromosomes decode to the same placement sequence, especially late in a run
+when offsprings mostly inherit elite genes. We cache fitnesses keyed on the decoded sequence.
+- The key is the (order, orientation) sequence given by Placement.sequence, not the raw genes.
+- The cache is bounded by a number of entries and/or a number of bytes, and evicts the least recently used entry.
+"""
+
+class FitnessCache:
+    def __init__(self,
+                 objective_function: Callable[[List[float]], float] = None,
+                 max_entries: int = None,
+                 max_bytes: int = None):
+        """
+        Parameters:
+        :param objective_function: Function mapping a chromosome to its fitness, called on a miss
+        :param max_entries: Maximum number of cached fitnesses
+        :param max_bytes: Maximum memory used by the cached keys and fitnesses
+        """
+        if max_entries is None and max_bytes is None:
+            raise ValueError('Cache size must be bounded by entries or bytes')
+
+        self.objective_function = objective_function
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[bytes, float] = OrderedDict()
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __call__(self, chromosome: List[float], **kwargs) -> float:
+        key = self.key(chromosome)
+        fitness = self.get(key)
+        if fitness is None:
+            fitness = self.objective_function(chromosome, **kwargs)
+            if fitness != np.inf: # Pruned evaluations are not exact, so they are not cached
+                self.put(key, fitness)
+        return fitness
+
+    @staticmethod
+    def key(chromosome: List[float]) -> bytes:
+        orders, orientations = Placement.sequence(chromosome)
+        return orders.astype(np.int32).tobytes() + orientations.astype(np.int8).tobytes()
+
+    @staticmethod
+    def size(key: bytes, fitness: float) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(fitness)
+
+    def get(self, key: bytes) -> Optional[float]:
+        with self.lock:
+            fitness = self.entries.get(key)
+            if fitness is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return fitness
+
+    def put(self, key: bytes, fitness: float) -> None:
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return
+            self.entries[key] = fitness
+            self.n_bytes += self.size(key, fitness)
+            while (self.max_entries is not None and len(self.entries) > self.max_entries) or \
+                  (self.max_bytes is not None and self.n_bytes > self.max_bytes and self.entries):
+                old_key, old_fitness = self.entries.popitem(last=False)
+                self.n_bytes -= self.size(old_key, old_fitness)
+                self.evictions += 1
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self.entries),
+            'bytes': self.n_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate
+        }
@@ -0,0 +1,197 @@
+import csv
+import json
+import time
+import numpy as np
+from contextlib import nullcontext
+from typing import List, Dict, Optional
+
+"""
+Instrumentation of Optimizer.optimize through callbacks.
+- Callbacks are notified when the run starts and ends, when each generation starts and ends, after each batch evaluation,
+  and whenever the best fitness of the population improves. The initial population is reported as generation -1.
+- The metrics of each generation are: wall time split into partitioning, mating, mutation, evaluation and replacement,
+  evaluations per second, best / mean / worst fitness, population diversity (mean standard deviation of the genes), and the
+  average number of EMSs left in the bins per decode.
+- Without callbacks, the hooks return immediately: no timer is started and no metric is computed.
+"""
+
+class Callback:
+    def on_optimize_start(self, optimizer) -> None:
+        pass
+
+    def on_generation_start(self, optimizer, generation: int) -> None:
+        pass
+
+    def on_evaluation(self, optimizer, chromosomes: List[List[float]], fitnesses: List[float], seconds: float) -> None:
+        pass
+
+    def on_new_best(self, optimizer, generation: int, fitness: float) -> None:
+        pass
+
+    def on_generation_end(self, optimizer, generation: int, metrics: dict) -> Optional[bool]:
+        """
+        - Return True to stop the run after this generation.
+        """
+        pass
+
+    def on_optimize_end(self, optimizer) -> None:
+        pass
+
+class MetricsRecorder(Callback):
+    """
+    Record the metrics of every generation and export them to CSV or JSON.
+    """
+    def __init__(self):
+        self.rows: List[dict] = []
+
+    def on_generation_end(self, optimizer, generation: int, metrics: dict) -> None:
+        self.rows.append(metrics)
+
+    def to_csv(self, path: str) -> None:
+        if not self.rows:
+            raise ValueError('No metrics recorded')
+        with open(path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(self.rows[0]))
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+    def to_json(self, path: str) -> None:
+        with open(path, 'w') as file:
+            json.dump(self.rows, file, indent=2)
+
+class TimeBudget(Callback):
+    """
+    Stop the run after the first generation that ends past the time budget.
+    """
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.start = None
+
+    def on_optimize_start(self, optimizer) -> None:
+        self.start = time.perf_counter()
+
+    def on_generation_end(self, optimizer, generation: int, metrics: dict) -> bool:
+        return time.perf_counter() - self.start >= self.seconds
+
+class _Section:
+    def __init__(self, times: Dict[str, float], name: str):
+        self.times = times
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *args) -> None:
+        self.times[self.name] = self.times.get(self.name, 0.0) + time.perf_counter() - self.start
+
+_DISABLED = nullcontext()
+
+class Instrumentation:
+    sections = ('partition', 'mating', 'mutation', 'replacement', 'evaluation')
+
+    def __init__(self, optimizer, callbacks: List[Callback] = None):
+        self.optimizer = optimizer
+        self.callbacks = list(callbacks or [])
+        self.enabled = bool(self.callbacks)
+        self.best_fitness = np.inf
+        self.times: Dict[str, float] = {}
+        self.n_evaluations = 0
+        self.generation = None
+        self.start_time = None
+        self.generation_time = None
+
+    def section(self, name: str):
+        """
+        - Context manager adding the wall time of its block to the given section of the current generation.
+        """
+        return _Section(self.times, name) if self.enabled else _DISABLED
+
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        self.start_time = time.perf_counter()
+        problem = self.optimizer.config.problem
+        if problem is not None:
+            problem.counters = {'decodes': 0, 'EMSs': 0}
+        for callback in self.callbacks:
+            callback.on_optimize_start(self.optimizer)
+
+    def begin(self, generation: int) -> None:
+        if not self.enabled:
+            return
+        self.generation = generation
+        self.times = {}
+        self.n_evaluations = 0
+        self.generation_time = time.perf_counter()
+        problem = self.optimizer.config.problem
+        if problem is not None:
+            problem.counters = {'decodes': 0, 'EMSs': 0}
+        for callback in self.callbacks:
+            callback.on_generation_start(self.optimizer, generation)
+
+    def evaluated(self, chromosomes: List[List[float]], fitnesses: List[float], seconds: float) -> None:
+        self.times['evaluation'] = self.times.get('evaluation', 0.0) + seconds
+        self.n_evaluations += len(chromosomes)
+        for callback in self.callbacks:
+            callback.on_evaluation(self.optimizer, chromosomes, fitnesses, seconds)
+
+    def end(self) -> bool:
+        """
+        - Compute the metrics of the current generation and notify the callbacks. Return True if a callback stops the run.
+        """
+        if not self.enabled:
+            return False
+        now = time.perf_counter()
+        chromosomes, fitnesses = self.optimizer.population.arrays()
+        finite = fitnesses[np.isfinite(fitnesses)]
+        evaluation = self.times.get('evaluation', 0.0)
+
+        # Chromosomes are evaluated during the replacement, so the evaluation time is taken out of it
+        metrics = {'generation': self.generation, 'elapsed_s': now - self.start_time, 'time_s': now - self.generation_time}
+        for name in self.sections:
+            metrics[f'{name}_s'] = self.times.get(name, 0.0)
+        metrics['replacement_s'] = max(0.0, metrics['replacement_s'] - evaluation)
+        metrics.update({
+            'evaluations': self.n_evaluations,
+            'evaluations_per_s': self.n_evaluations / evaluation if evaluation else 0.0,
+            'best_fitness': float(finite.min()) if finite.size else np.inf,
+            'mean_fitness': float(finite.mean()) if finite.size else np.inf,
+            'worst_fitness': float(finite.max()) if finite.size else np.inf,
+            'pruned': int(fitnesses.size - finite.size),
+            'diversity': float(chromosomes.std(axis=0).mean()) if len(chromosomes) else 0.0,
+            'EMSs_per_decode': self.EMSs_per_decode()
+        })
+        if self.optimizer.cache is not None:
+            metrics['cache_hit_rate'] = self.optimizer.cache.hit_rate
+        local_search = self.optimizer.config.local_search
+        if local_search is not None:
+            metrics['local_search_s'] = self.times.get('local_search', 0.0)
+            metrics['local_search_moves'] = local_search.last.get('moves', 0)
+            metrics['local_search_accepted'] = local_search.last.get('accepted', 0)
+
+        if metrics['best_fitness'] < self.best_fitness:
+            self.best_fitness = metrics['best_fitness']
+            for callback in self.callbacks:
+                callback.on_new_best(self.optimizer, self.generation, self.best_fitness)
+
+        stop = False
+        for callback in self.callbacks:
+            stop = bool(callback.on_generation_end(self.optimizer, self.generation, metrics)) or stop
+        return stop
+
+    def EMSs_per_decode(self) -> Optional[float]:
+        # Decodes in worker processes update copies of the problem, so they can not be counted here
+        problem = self.optimizer.config.problem
+        if problem is None or problem.counters is None or self.optimizer.evaluator.executor == 'process':
+            return None
+        counters = problem.counters
+        return counters['EMSs'] / counters['decodes'] if counters['decodes'] else None
+
+    def finish(self) -> None:
+        if not self.enabled:
+            return
+        for callback in self.callbacks:
+            callback.on_optimize_end(self.optimizer)
+        problem = self.optimizer.config.problem
+        if problem is not None:
+            problem.counters = None
@@ -0,0 +1,145 @@
+import os
+import time
+import threading
+import numpy as np
+from typing import Optional
+from callbacks import Callback
+
+"""
+Checkpoints of a running optimizer, to resume long solves after a crash or a preemption.
+- A checkpoint holds the chromosomes and fitnesses of the population, the index of the last completed generation,
+  the state of the random number generator of the optimizer and the best solution recorded in the Problem.
+- It is written as an uncompressed .npz to a temporary file, then renamed over the previous checkpoint (atomic on POSIX and
+  Windows), so an interrupted write never leaves a truncated checkpoint behind.
+- The state is copied in the generation loop, and the file is written by a background thread.
+- Resuming with Optimizer.restore continues the run exactly as if it had not been interrupted.
+"""
+
+def snapshot(optimizer, generation: int) -> dict:
+    """
+    - Copy the state of the optimizer after the given generation, in the form written to the checkpoint.
+    """
+    chromosomes, fitnesses = optimizer.population.arrays()
+    name, keys, position, has_gauss, cached_gaussian = optimizer.rng.get_state()
+    state = {
+        'generation': np.int64(generation),
+        'chromosomes': np.array(chromosomes, dtype=float),
+        'fitnesses': np.array(fitnesses, dtype=float),
+        'rng_name': np.str_(name),
+        'rng_keys': np.array(keys),
+        'rng_position': np.int64(position),
+        'rng_has_gauss': np.int64(has_gauss),
+        'rng_cached_gaussian': np.float64(cached_gaussian)
+    }
+
+    problem = optimizer.config.problem
+    if problem is not None:
+        state['best_fitness'] = np.float64(problem.best_fitness)
+        state['used_bins'] = np.int64(problem.used_bins)
+        if problem.solution is not None:
+            # The structured array of the solution (see solutions.py) is stored as is
+            state['loads'] = np.array(problem.loads)
+            state['solution'] = np.array(problem.solution)
+    return state
+
+def write(path: str, state: dict) -> None:
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        np.savez(file, **state)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+def load(path: str) -> dict:
+    with np.load(path) as file:
+        return {key: file[key] for key in file.files}
+
+def restore(state: dict, optimizer) -> int:
+    """
+    - Restore the population, the random number generator and the best solution of the optimizer.
+    - Return the index of the last completed generation.
+    """
+    chromosomes, fitnesses = state['chromosomes'], state['fitnesses']
+    population = optimizer.population
+    if chromosomes.shape != (population.n_individuals, population.n_genes):
+        raise ValueError(f'Checkpoint population of shape {chromosomes.shape} does not match the configuration')
+    population.restore(chromosomes, fitnesses)
+
+    optimizer.rng.set_state((str(state['rng_name']),
+                             state['rng_keys'],
+                             int(state['rng_position']),
+                             int(state['rng_has_gauss']),
+                             float(state['rng_cached_gaussian'])))
+
+    problem = optimizer.config.problem
+    if problem is not None and 'best_fitness' in state:
+        problem.best_fitness = float(state['best_fitness'])
+        problem.used_bins = int(state['used_bins'])
+        if 'solution' in state:
+            problem.loads = state['loads'].tolist()
+            problem.solution = state['solution']
+    return int(state['generation'])
+
+class Checkpoint(Callback):
+    def __init__(self, path: str, interval: int = None, seconds: float = None, background: bool = True):
+        """
+        Parameters:
+        :param path: Checkpoint file, replaced at each save
+        :param interval: Save every interval generations
+        :param seconds: Save at the end of the first generation after this many seconds since the last save
+        :param background: Write the file from a background thread
+        """
+        if interval is None and seconds is None:
+            raise ValueError('Checkpoint needs an interval of generations or of seconds')
+        if interval is not None and interval < 1:
+            raise ValueError('Checkpoint interval must be a positive integer')
+
+        self.path = path
+        self.interval = interval
+        self.seconds = seconds
+        self.background = background
+        self.last_save = None
+        self.thread: Optional[threading.Thread] = None
+        self.error: Optional[BaseException] = None
+        self.n_saves = 0
+
+    def on_optimize_start(self, optimizer) -> None:
+        self.last_save = time.perf_counter()
+
+    def due(self, generation: int) -> bool:
+        if self.interval is not None and (generation + 1) % self.interval == 0:
+            return True
+        return self.seconds is not None and time.perf_counter() - self.last_save >= self.seconds
+
+    def on_generation_end(self, optimizer, generation: int, metrics: dict) -> None:
+        if self.due(generation):
+            self.save(optimizer, generation)
+
+    def on_optimize_end(self, optimizer) -> None:
+        self.wait()
+
+    def save(self, optimizer, generation: int) -> None:
+        state = snapshot(optimizer, generation)
+        self.last_save = time.perf_counter()
+        self.n_saves += 1
+        # Saves are written in order: a new one waits for the previous write, which is normally long finished
+        self.wait()
+        if self.background:
+            self.thread = threading.Thread(target=self.run, args=(state,), daemon=True)
+            self.thread.start()
+        else:
+            write(self.path, state)
+
+    def run(self, state: dict) -> None:
+        try:
+            write(self.path, state)
+        except BaseException as error:
+            self.error = error
+
+    def wait(self) -> None:
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
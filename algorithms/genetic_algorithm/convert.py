@@ -0,0 +1,51 @@
+import os
+import time
+import argparse
+from typing import List
+from problem import Problem
+
+"""
+Convert text instances (.dat) to the compact binary instance format of Problem (.bin).
+- Run from this directory: python convert.py instance.dat [...] [--output-dir directory]
+"""
+
+def convert(path: str, output: str = None) -> str:
+    """
+    Convert one text instance to the binary format and return the path of the binary instance.
+    - By default, the binary instance is written next to the text one, with the .bin extension.
+    """
+    output = output or os.path.splitext(path)[0] + '.bin'
+    Problem(path).save_binary(output)
+    return output
+
+def convert_all(paths: List[str], output_dir: str = None) -> List[str]:
+    outputs = []
+    for path in paths:
+        output = None
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            output = os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + '.bin')
+        outputs.append(convert(path, output))
+    return outputs
+
+def compare_loading(path: str, binary_path: str, repeats: int = 100) -> None:
+    """
+    Compare the time to load an instance from its text and binary formats.
+    """
+    for name, instance in (('text', path), ('binary', binary_path)):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            Problem(instance)
+        print(f'{name}: {1e3 * (time.perf_counter() - start) / repeats:.3f} ms per load')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert text instances to the binary instance format')
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--output-dir', help='Directory of the binary instances (default: next to the text instances)')
+    parser.add_argument('--compare', action='store_true', help='Compare the loading time of both formats')
+    args = parser.parse_args()
+
+    for path, output in zip(args.paths, convert_all(args.paths, args.output_dir)):
+        print(f'{path} -> {output}')
+        if args.compare:
+            compare_loading(path, output)
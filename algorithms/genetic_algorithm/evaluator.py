@@ -0,0 +1,115 @@
+from typing import List, Callable, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from cache import FitnessCache
+
+"""
+We evaluate the chromosomes of a generation as one batch through a pluggable executor.
+- 'serial': chromosomes are evaluated one after another in the calling thread.
+- 'thread': chunks of chromosomes are evaluated by a thread pool.
+- 'process': chunks of chromosomes are evaluated by a process pool.
+The objective function (and the Problem bound to it) is shipped to each worker process only once, when the worker starts.
+An optional FitnessCache is looked up in this process before dispatching, so only cache misses reach the executor.
+"""
+
+# Objective function of the current worker process, set once by the pool initializer
+_objective_function: Callable[[List[float]], float] = None
+
+def _initialize_worker(objective_function: Callable[[List[float]], float]) -> None:
+    global _objective_function
+    _objective_function = objective_function
+
+def _evaluate_chunk(chunk: List[List[float]],
+                    cutoff: Optional[float] = None,
+                    objective_function: Optional[Callable[[List[float]], float]] = None) -> List[float]:
+    objective_function = objective_function or _objective_function
+    if cutoff is None:
+        return [objective_function(chromosome) for chromosome in chunk]
+    return [objective_function(chromosome, cutoff=cutoff) for chromosome in chunk]
+
+class Evaluator:
+    executors = ('serial', 'thread', 'process')
+
+    def __init__(self,
+                 objective_function: Callable[[List[float]], float],
+                 executor: str = 'serial',
+                 n_workers: int = None,
+                 chunk_size: int = 1,
+                 cache: FitnessCache = None):
+        """
+        Parameters:
+        :param objective_function: Function mapping a chromosome to its fitness
+        :param executor: One of 'serial', 'thread' or 'process'
+        :param n_workers: Number of workers of the pool (defaults to the number of CPUs)
+        :param chunk_size: Number of chromosomes sent to a worker at once
+        :param cache: Optional fitness cache keyed on the decoded placement sequence
+        """
+        if executor not in self.executors:
+            raise ValueError(f'Unknown executor: {executor}')
+        if chunk_size < 1:
+            raise ValueError('Chunk size must be a positive integer')
+
+        self.objective_function = objective_function
+        self.executor = executor
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.pool: Executor = None
+
+    def start(self) -> None:
+        if self.pool is not None or self.executor == 'serial':
+            return
+        if self.executor == 'thread':
+            self.pool = ThreadPoolExecutor(max_workers=self.n_workers)
+        else:
+            self.pool = ProcessPoolExecutor(max_workers=self.n_workers,
+                                            initializer=_initialize_worker,
+                                            initargs=(self.objective_function,))
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self) -> 'Evaluator':
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def evaluate(self, chromosomes: List[List[float]], cutoff: float = None) -> List[float]:
+        """
+        - Return the fitness of each chromosome, in the same order as the chromosomes.
+        - With a cache, chromosomes decoding to the same sequence are evaluated at most once.
+        - With a cutoff, the objective function may return infinity for chromosomes that cannot beat it.
+        """
+        if self.cache is None:
+            return self.dispatch(chromosomes, cutoff)
+
+        keys = [self.cache.key(chromosome) for chromosome in chromosomes]
+        fitnesses = [self.cache.get(key) for key in keys]
+        misses = {}
+        for i, key in enumerate(keys):
+            if fitnesses[i] is None and key not in misses:
+                misses[key] = i
+
+        indices = list(misses.values())
+        for i, fitness in zip(indices, self.dispatch([chromosomes[i] for i in indices], cutoff)):
+            if fitness != float('inf'): # Pruned evaluations are not exact, so they are not cached
+                self.cache.put(keys[i], fitness)
+            fitnesses[i] = fitness
+
+        # Chromosomes repeating a sequence missed earlier in the same batch take its fitness
+        return [fitness if fitness is not None else fitnesses[misses[key]] for key, fitness in zip(keys, fitnesses)]
+
+    def dispatch(self, chromosomes: List[List[float]], cutoff: float = None) -> List[float]:
+        if self.executor == 'serial' or len(chromosomes) == 0:
+            return _evaluate_chunk(chromosomes, cutoff, self.objective_function)
+
+        self.start()
+        chunks = [chromosomes[i:i + self.chunk_size] for i in range(0, len(chromosomes), self.chunk_size)]
+        if self.executor == 'thread':
+            futures = [self.pool.submit(_evaluate_chunk, chunk, cutoff, self.objective_function) for chunk in chunks]
+        else:
+            futures = [self.pool.submit(_evaluate_chunk, chunk, cutoff) for chunk in chunks]
+        return [fitness for future in futures for fitness in future.result()]
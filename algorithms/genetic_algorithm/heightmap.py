@@ -0,0 +1,114 @@
+import numpy as np
+from typing import Tuple
+
+"""
+Height maps of bins, for policies that look at a bin from above (e.g. the CNN of reinforcement_learning/model.py).
+- The height map of a bin is an int16 grid over its base, at the resolution of the model (32 x 32 by default). Each cell
+  holds the top of the highest item over it.
+- Bins of any size are resampled to the grid. A cell covers a rectangle of the base, and an item raises every cell its
+  footprint overlaps, so a cell never reports less than the true height over any part of it.
+- Placing an item only touches the cells of its footprint.
+- The maps of a batch of bins are the rows of one (B, R, R) buffer. Each bin updates its own row in place, and the whole
+  batch is exposed as a torch tensor sharing the memory of the buffer, so a policy reads it without a copy per step.
+"""
+
+def footprints(boxes: np.ndarray, bin_size: Tuple[int], resolution: Tuple[int]) -> Tuple[np.ndarray, ...]:
+    """
+    - The cells covered by the footprints of boxes (n, 6): first and last (excluded) row along x, then along y.
+    """
+    boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 6)
+    rows = boxes[:, 0] * resolution[0] // bin_size[0], -(-boxes[:, 3] * resolution[0] // bin_size[0])
+    columns = boxes[:, 1] * resolution[1] // bin_size[1], -(-boxes[:, 4] * resolution[1] // bin_size[1])
+    return rows[0], rows[1], columns[0], columns[1]
+
+class HeightMap:
+    def __init__(self, bin_size: Tuple[int], resolution: Tuple[int] = (32, 32), map: np.ndarray = None):
+        """
+        Parameters:
+        :param bin_size: Size of the bin in 3 dimensions
+        :param resolution: Number of cells along x and y
+        :param map: int16 array of shape resolution to update in place (e.g. a row of HeightMaps); a new one if None
+        """
+        if bin_size[2] > np.iinfo(np.int16).max:
+            raise ValueError('Bin height does not fit in an int16 height map')
+        self.bin_size = tuple(bin_size)
+        self.resolution = tuple(resolution)
+        self.map = np.zeros(self.resolution, dtype=np.int16) if map is None else map
+
+    def update(self, box: Tuple[int]) -> None:
+        """
+        - Raise the cells under the footprint of a placed box (x1, y1, z1, x2, y2, z2) to its top.
+        """
+        # Same cells as footprints, in plain integers since a single box is placed
+        (X, Y, _), (R, C) = self.bin_size, self.resolution
+        footprint = self.map[box[0] * R // X:-(-box[3] * R // X), box[1] * C // Y:-(-box[4] * C // Y)]
+        np.maximum(footprint, box[5], out=footprint)
+
+    def reset(self) -> None:
+        self.map.fill(0)
+
+    def copy(self) -> 'HeightMap':
+        return HeightMap(self.bin_size, self.resolution, self.map.copy())
+
+class HeightMaps:
+    def __init__(self, batch_size: int, bin_size: Tuple[int], resolution: Tuple[int] = (32, 32)):
+        """
+        Parameters:
+        :param batch_size: Number of bins (B)
+        :param bin_size: Size of the bins in 3 dimensions
+        :param resolution: Number of cells along x and y
+        """
+        if bin_size[2] > np.iinfo(np.int16).max:
+            raise ValueError('Bin height does not fit in an int16 height map')
+        self.bin_size = tuple(bin_size)
+        self.resolution = tuple(resolution)
+        self.maps = np.zeros((batch_size, *self.resolution), dtype=np.int16)
+        self._tensor = None
+
+    def __len__(self) -> int:
+        return len(self.maps)
+
+    def __getitem__(self, index: int) -> HeightMap:
+        # The height map of one bin, as a view on its row of the buffer
+        return HeightMap(self.bin_size, self.resolution, self.maps[index])
+
+    def update(self, boxes: np.ndarray, bins: np.ndarray = None) -> None:
+        """
+        - Raise the footprint of one placed box (n, 6) in each of the given bins (all bins by default), in one operation.
+        - Only the cells of the footprints are read and written.
+        """
+        boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 6)
+        bins = np.arange(len(self.maps)) if bins is None else np.asarray(bins)
+        x1, x2, y1, y2 = footprints(boxes, self.bin_size, self.resolution)
+
+        # Flat (bin, row, column) indices of every footprint cell, box by box
+        widths, n_cells = y2 - y1, (x2 - x1) * (y2 - y1)
+        owners = np.repeat(np.arange(len(boxes)), n_cells)
+        offsets = np.arange(len(owners)) - np.repeat(np.cumsum(n_cells) - n_cells, n_cells)
+        rows = x1[owners] + offsets // widths[owners]
+        columns = y1[owners] + offsets % widths[owners]
+
+        cells = (bins[owners], rows, columns)
+        self.maps[cells] = np.maximum(self.maps[cells], boxes[owners, 5])
+
+    def reset(self, bins: np.ndarray = None) -> None:
+        if bins is None:
+            self.maps.fill(0)
+        else:
+            self.maps[bins] = 0
+
+    def tensor(self):
+        """
+        - The buffer as a torch tensor of shape (B, R, R), created once: it shares the memory of the buffer, so it always
+          holds the current height maps. torch is only imported here.
+        """
+        if self._tensor is None:
+            import torch
+            self._tensor = torch.from_numpy(self.maps)
+        return self._tensor
+
+if 11 < 3:
+    height_maps = HeightMaps(2, (100, 100, 100))
+    height_maps.update([[0, 0, 0, 50, 30, 20], [10, 10, 0, 20, 20, 70]])
+    height_maps[0].update((40, 40, 20, 100, 100, 45))
+    print(height_maps.tensor().max(), height_maps.maps[0, ::4, ::4])
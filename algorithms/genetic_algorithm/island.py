@@ -0,0 +1,180 @@
+import queue
+import numpy as np
+import multiprocessing as mp
+from typing import List, Tuple, Dict, Optional
+from optimizer import Configuration, Optimizer
+
+"""
+We implement an island model of the genetic algorithm.
+- K independent populations (islands) evolve in separate processes, each with its own random number stream.
+- Every M generations, each island sends copies of its best individuals to its neighbours (ring or fully connected topology),
+  which replace their worst individuals with them.
+- Migration is synchronous, so a run is reproducible for a given seed (unless an island stops early at the lower bound).
+- At the end, the best individual over all islands is decoded again to record it into the Problem.
+"""
+
+def _receive(inbox: mp.Queue,
+             pending: Dict[int, List[Tuple[np.ndarray, np.ndarray]]],
+             generation: int,
+             n_senders: int,
+             stop: mp.Event) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    - Wait for the migrants of all in-neighbours for the given generation, or return None if the run is stopped.
+    - Migrants of a later generation (from faster neighbours) are kept aside until they are needed.
+    """
+    while len(pending.get(generation, [])) < n_senders:
+        try:
+            epoch, chromosomes, fitnesses = inbox.get(timeout=0.05)
+        except queue.Empty:
+            if stop.is_set():
+                return None
+            continue
+        pending.setdefault(epoch, []).append((chromosomes, fitnesses))
+
+    messages = pending.pop(generation)
+    return np.concatenate([chromosomes for chromosomes, _ in messages]), np.concatenate([fitnesses for _, fitnesses in messages])
+
+def _run_island(index: int,
+                parameters: dict,
+                seed: int,
+                migration_interval: int,
+                n_migrants: int,
+                inbox: mp.Queue,
+                outboxes: List[mp.Queue],
+                n_senders: int,
+                stop: mp.Event,
+                results: mp.Queue) -> None:
+    # Undelivered migrants must not keep the island process alive when it exits
+    for outbox in outboxes:
+        outbox.cancel_join_thread()
+
+    config = Configuration(**parameters)
+    population = Optimizer(config, seed=seed).population
+    n_immigrants = population.n_individuals - population.n_elites
+
+    pending = {}
+    generation = 0
+    population.initialize()
+    for generation in range(config.n_generations):
+        population.partition()
+        if stop.is_set():
+            break
+
+        if generation and generation % migration_interval == 0:
+            if config.early_stop and config.problem is not None and config.problem.used_bins <= config.problem.lower_bound:
+                stop.set()
+            chromosomes, fitnesses = population.best(n_migrants)
+            for outbox in outboxes:
+                outbox.put((generation, np.asarray(chromosomes), np.asarray(fitnesses)))
+            migrants = _receive(inbox, pending, generation, n_senders, stop)
+            if migrants is None:
+                break
+            chromosomes, fitnesses = migrants
+            best = np.argsort(fitnesses, kind='stable')[:n_immigrants]
+            population.replace_worst(chromosomes[best], fitnesses[best])
+
+        offsprings = population.mating()
+        mutants = population.mutation()
+        population.next_generation(offsprings, mutants)
+
+    population.partition()
+    chromosomes, fitnesses = population.best(1)
+    results.put((index, float(fitnesses[0]), np.asarray(chromosomes[0]), generation + 1))
+
+def _collect(results: mp.Queue, processes: List[mp.Process]) -> List[Tuple[int, float, np.ndarray, int]]:
+    """
+    - Wait for the result of every island, and raise a RuntimeError if an island process exits without posting its result.
+    """
+    collected = {}
+    while len(collected) < len(processes):
+        try:
+            result = results.get(timeout=0.05)
+        except queue.Empty:
+            exited = [index for index, process in enumerate(processes) if index not in collected and process.exitcode is not None]
+            if not exited:
+                continue
+            # A result is flushed before its island exits, so it is read once more before the island is declared failed
+            try:
+                result = results.get(timeout=0.05)
+            except queue.Empty:
+                raise RuntimeError(f'Island {exited[0]} exited with code {processes[exited[0]].exitcode} without a result')
+        collected[result[0]] = result
+    return [collected[index] for index in range(len(processes))]
+
+class IslandOptimizer:
+    topologies = ('ring', 'full')
+
+    def __init__(self, config: Configuration, n_islands: int = 4, migration_interval: int = 10, n_migrants: int = 2, topology: str = 'ring', seed: int = 0):
+        """
+        Parameters:
+        :param config: Parameters of the solve, whose objective function and problem must be picklable
+        :param n_islands: Number of islands, each evolved in its own process
+        :param migration_interval: Number of generations between two migrations
+        :param n_migrants: Number of best individuals sent to each neighbour
+        :param topology: 'ring' (each island sends to the next one) or 'full' (each island sends to all others)
+        :param seed: Seed from which the random number stream of each island is derived
+        """
+        if topology not in self.topologies:
+            raise ValueError(f'Unknown topology: {topology}')
+        if n_islands < 1 or migration_interval < 1 or n_migrants < 0:
+            raise ValueError('Invalid island model parameters')
+
+        self.config = config
+        self.n_islands = n_islands
+        self.migration_interval = migration_interval
+        self.n_migrants = n_migrants
+        self.topology = topology
+        self.seed = seed
+        self.results: List[Tuple[int, float, np.ndarray, int]] = []
+
+    def neighbours(self, index: int) -> List[int]:
+        if self.n_islands == 1:
+            return []
+        if self.topology == 'ring':
+            return [(index + 1) % self.n_islands]
+        return [other for other in range(self.n_islands) if other != index]
+
+    def optimize(self) -> float:
+        context = mp.get_context()
+        inboxes = [context.Queue() for _ in range(self.n_islands)]
+        results = context.Queue()
+        stop = context.Event()
+        seeds = np.random.SeedSequence(self.seed).generate_state(self.n_islands)
+        n_senders = [0] * self.n_islands
+        for index in range(self.n_islands):
+            for neighbour in self.neighbours(index):
+                n_senders[neighbour] += 1
+
+        # Each island evaluates serially: the islands themselves use the cores
+        parameters = dict(vars(self.config))
+        parameters['executor'] = 'serial'
+
+        processes = [
+            context.Process(target=_run_island,
+                            args=(index, parameters, int(seeds[index]), self.migration_interval, self.n_migrants,
+                                  inboxes[index], [inboxes[neighbour] for neighbour in self.neighbours(index)],
+                                  n_senders[index], stop, results))
+            for index in range(self.n_islands)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            self.results = _collect(results, processes)
+        except RuntimeError:
+            # The other islands stop at their next generation, and are terminated if they do not exit in time
+            stop.set()
+            for process in processes:
+                process.join(timeout=1.0)
+                if process.is_alive():
+                    process.terminate()
+            raise
+        for process in processes:
+            process.join()
+
+        # Decode the global best again in this process to record it into the Problem
+        _, best_fitness, best_chromosome, _ = min(self.results, key=lambda result: result[1])
+        self.config.objective_function(best_chromosome)
+        if self.config.verbose:
+            for index, fitness, _, n_generations in self.results:
+                print(f'Island {index}: best fitness {fitness} after {n_generations} generations')
+        return best_fitness
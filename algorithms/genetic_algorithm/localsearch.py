@@ -0,0 +1,186 @@
+import time
+import numpy as np
+from typing import Tuple, Dict
+from problem import Problem, Placement
+
+"""
+Local search polishing the best individuals of each generation.
+- Moves act on the decoded placement sequence: swap two items, move one item to another position (insert), or give one item
+  another orientation (rotate).
+- The packing of the current sequence is snapshotted every `interval` items. A move leaves the items before its first
+  changed position untouched, so it is evaluated by resuming from the deepest snapshot before that position.
+  The state after a prefix only depends on that prefix (and on the remaining items, which are the same), so the fitness is
+  identical to a full decode.
+- Trial packings are abandoned as soon as they cannot beat the current fitness (pruning of Placement.pack).
+- Trial packings take their snapshots in a scratch store, which replaces the snapshots after the resumed position when the
+  move is accepted (the first improving move is).
+- The search of a generation stops after max_moves moves or seconds seconds, shared equally by the polished individuals
+  (the remainder of the moves goes to the best ones).
+- An improved sequence is written back into the chromosome with the same set of order genes, so only the moved items change rank.
+"""
+
+class Snapshot:
+    def __init__(self, placement: Placement):
+        self.bins = [bin.copy() for bin in placement.bins]
+        self.used_bins = placement.used_bins
+        self.closed_EMSs = placement.closed_EMSs
+        self.placed = list(placement.placed)
+
+    def restore(self, placement: Placement) -> None:
+        # Snapshots are shared between the trial packings, so they are copied again before packing resumes
+        placement.bins = [bin.copy() for bin in self.bins]
+        placement.used_bins = self.used_bins
+        placement.closed_EMSs = self.closed_EMSs
+        placement.placed = list(self.placed)
+
+class LocalSearch:
+    moves = ('swap', 'insert', 'rotate')
+
+    def __init__(self, problem: Problem, n_elites: int = 1, max_moves: int = 100, seconds: float = None, interval: int = 20, **kwargs):
+        """
+        Parameters:
+        :param problem: Problem whose solutions are improved
+        :param n_elites: Number of best individuals polished each generation
+        :param max_moves: Number of moves tried per generation
+        :param seconds: Time spent per generation (the search then also stops after max_moves moves)
+        :param interval: Number of placed items between two snapshots
+        :param kwargs: Keyword arguments of Placement (backend, update_mode, ...)
+        """
+        if interval < 1:
+            raise ValueError('Snapshot interval must be a positive integer')
+        if n_elites < 1 or max_moves < 1:
+            raise ValueError('Number of elites and of moves must be positive integers')
+
+        self.problem = problem
+        self.n_elites = n_elites
+        self.max_moves = max_moves
+        self.seconds = seconds
+        self.interval = interval
+        self.kwargs = kwargs
+
+        self.n_tried = 0
+        self.n_accepted = 0
+        self.n_pruned = 0
+        self.n_repacked_items = 0
+        self.time = 0.0
+        self.last: Dict[str, float] = {}
+
+    def pack(self, sequence: np.ndarray, orientations: np.ndarray, start: int, checkpoints: Dict[int, Snapshot], cutoff: float = None, snapshots: Dict[int, Snapshot] = None) -> Tuple[float, Placement]:
+        """
+        - Pack a sequence (item at each position, in the given orientations) from the snapshot at position start (an empty placement if 0), and return its
+          fitness (infinity if pruned) and the placement. New snapshots are added to snapshots if given.
+        """
+        placement = Placement(self.problem, **self.kwargs)
+        placement.arrange(sequence, orientations)
+        if start:
+            checkpoints[start].restore(placement)
+
+        def checkpoint(position: int) -> None:
+            snapshots[position] = Snapshot(placement)
+
+        placement.pack(start, self.interval, checkpoint if snapshots is not None else None, cutoff)
+        return (np.inf if placement.pruned else placement.fitness()), placement
+
+    def propose(self, sequence: np.ndarray, orientations: np.ndarray, rng: np.random.RandomState) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        - Draw a random move and return the new sequence (item at each position), the new orientations (of each item)
+          and the first position it changes.
+        """
+        n = len(sequence)
+        move = self.moves[rng.randint(len(self.moves))]
+        if move == 'rotate':
+            position = rng.randint(n)
+            orientations = orientations.copy()
+            orientations[sequence[position]] = (orientations[sequence[position]] + rng.randint(1, 6) - 1) % 6 + 1
+            return sequence, orientations, position
+
+        first, second = rng.choice(n, 2, replace=False)
+        sequence = sequence.copy()
+        if move == 'swap':
+            sequence[first], sequence[second] = sequence[second], sequence[first]
+        else:
+            sequence = np.insert(np.delete(sequence, first), second, sequence[first])
+        return sequence, orientations, int(min(first, second))
+
+    def improve(self, chromosome: np.ndarray, rng: np.random.RandomState, max_moves: int, deadline: float = None) -> Tuple[np.ndarray, float]:
+        """
+        - Run the local search from a chromosome and return the improved chromosome and its fitness.
+        """
+        chromosome = np.array(chromosome, dtype=float)
+        n = len(chromosome) // 2
+        positions, orientations = Placement.sequence(chromosome)
+        orientations = np.clip(orientations, 1, 6)
+        sequence = np.empty(n, dtype=int)
+        sequence[positions] = np.arange(n)
+        keys = np.sort(chromosome[:n])
+
+        checkpoints: Dict[int, Snapshot] = {}
+        fitness, _ = self.pack(sequence, orientations, 0, checkpoints, snapshots=checkpoints)
+        improved = False
+
+        for _ in range(max_moves):
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            new_sequence, new_orientations, first = self.propose(sequence, orientations, rng)
+            start = max((position for position in checkpoints if position <= first), default=0)
+            trial: Dict[int, Snapshot] = {}
+            new_fitness, _ = self.pack(new_sequence, new_orientations, start, checkpoints, fitness, trial)
+            self.n_tried += 1
+            self.n_repacked_items += n - start
+            if new_fitness == np.inf:
+                self.n_pruned += 1
+            if new_fitness >= fitness:
+                continue
+
+            self.n_accepted += 1
+            improved = True
+            sequence, orientations, fitness = new_sequence, new_orientations, new_fitness
+            checkpoints = {position: snapshot for position, snapshot in checkpoints.items() if position <= start}
+            checkpoints.update(trial)
+
+        if improved:
+            positions = np.empty(n, dtype=int)
+            positions[sequence] = np.arange(n)
+            # argsort of the order genes gives the position of each item, so the i-th smallest gene goes to positions[i]
+            chromosome[positions] = keys
+            changed = orientations != np.clip(np.ceil(6 * chromosome[n:]).astype(int), 1, 6)
+            chromosome[n:][changed] = (orientations[changed] - 0.5) / 6
+        return chromosome, fitness
+
+    def __call__(self, population, rng: np.random.RandomState) -> None:
+        """
+        - Polish the n_elites best individuals of a partitioned population in place.
+        - The moves are drawn from a generator seeded by rng, so a run with a move budget only is reproducible.
+        """
+        start = time.perf_counter()
+        tried, accepted = self.n_tried, self.n_accepted
+        search_rng = np.random.RandomState(rng.randint(2 ** 31))
+        chromosomes, fitnesses = population.best(self.n_elites)
+        n_elites = len(chromosomes)
+        ranks, improved_chromosomes, improved_fitnesses = [], [], []
+        for rank in range(n_elites):
+            deadline = start + self.seconds * (rank + 1) / n_elites if self.seconds is not None else None
+            max_moves = self.max_moves // n_elites + (rank < self.max_moves % n_elites)
+            if max_moves == 0:
+                continue
+            chromosome, fitness = self.improve(chromosomes[rank], search_rng, max_moves, deadline)
+            if fitness < fitnesses[rank]:
+                ranks.append(rank)
+                improved_chromosomes.append(chromosome)
+                improved_fitnesses.append(fitness)
+        # The ranks refer to the partition the search started from, so the improved individuals are replaced at once
+        if ranks:
+            population.update_best(ranks, improved_chromosomes, improved_fitnesses)
+
+        elapsed = time.perf_counter() - start
+        self.time += elapsed
+        self.last = {'moves': self.n_tried - tried, 'accepted': self.n_accepted - accepted, 'time_s': elapsed}
+
+    def stats(self) -> dict:
+        return {
+            'moves': self.n_tried,
+            'accepted': self.n_accepted,
+            'pruned': self.n_pruned,
+            'time_s': self.time,
+            'repacked_items_per_move': self.n_repacked_items / self.n_tried if self.n_tried else 0.0
+        }
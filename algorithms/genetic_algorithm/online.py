@@ -0,0 +1,190 @@
+import time
+import numpy as np
+from typing import List, Tuple, Dict, Iterable, Iterator, AsyncIterable, AsyncIterator, Callable, Optional
+from problem import Placement
+
+"""
+Online packing: items arrive one by one and are placed immediately, without a chromosome.
+- Each item is tried in every allowed orientation in the open bins, oldest first. In the first bin that can hold it, the
+  (orientation, EMS) pair with the largest Distance to the Front-Top-Right Corner (FTR) is selected, as Bin.choose does for EMSs.
+- Bins keep their EMSs with the difference process, so EMSs stay truly empty and no candidate is checked against placed items.
+- At most max_open_bins bins are open. When an item fits in none of them, a bin is closed (the oldest or the fullest) before
+  a new one is opened. Closed bins are handed to on_close and are never searched again.
+The work per item depends on the number of open bins and on their EMSs, not on the number of items placed so far.
+"""
+
+class OnlinePacker:
+    policies = ('oldest', 'fullest')
+
+    def __init__(self,
+                 bin_size: Tuple[int],
+                 max_open_bins: int = 4,
+                 policy: str = 'oldest',
+                 orientations: List[int] = (1, 2, 3, 4, 5, 6),
+                 min_size: int = 1,
+                 backend: str = 'array',
+                 on_close: Callable[[int, Placement.Bin], None] = None,
+                 window: int = 10000):
+        """
+        Parameters:
+        :param bin_size: Size of the bins in 3 dimensions
+        :param max_open_bins: Maximum number of open bins
+        :param policy: Bin closed when a new bin is needed: 'oldest' (first opened) or 'fullest' (largest load)
+        :param orientations: Allowed orientations of the items (see Placement.get_size)
+        :param min_size: Smallest dimension of any incoming item: smaller EMSs are dropped
+        :param backend: Bin backend of Placement ('list' or 'array')
+        :param on_close: Function called with the index and the bin of each closed bin
+        :param window: Number of most recent items kept for the latency statistics
+        """
+        if max_open_bins < 1:
+            raise ValueError('Number of open bins must be a positive integer')
+        if policy not in self.policies:
+            raise ValueError(f'Unknown closing policy: {policy}')
+        if backend not in Placement.backends:
+            raise ValueError(f'Unknown backend: {backend}')
+        if not orientations or any(orientation not in range(1, 7) for orientation in orientations):
+            raise ValueError('Orientations must be a non-empty subset of 1 to 6')
+
+        self.bin_size = tuple(bin_size)
+        self.max_open_bins = max_open_bins
+        self.policy = policy
+        self.orientations = tuple(orientations)
+        self.min_size = min_size
+        self.Bin = Placement.backends[backend]
+        self.on_close = on_close
+
+        self.open_bins: List[Tuple[int, Placement.Bin]] = [] # (index, bin), oldest first
+        self.used_bins = 0
+        self.n_items = 0
+        self.closed_loads: List[int] = []
+
+        # Latencies of the most recent items, in a ring buffer
+        self.latencies = np.zeros(window)
+        self.n_latencies = 0
+
+    def rotations(self, item: Tuple[int]) -> List[Tuple[int, Tuple[int]]]:
+        """
+        - Allowed (orientation, size) pairs of an item, without duplicate sizes.
+        """
+        rotations, sizes = [], set()
+        for orientation in self.orientations:
+            size = Placement.get_size(item, orientation)
+            if size not in sizes:
+                sizes.add(size)
+                rotations.append((orientation, size))
+        return rotations
+
+    @staticmethod
+    def position(bin: Placement.Bin, EMS) -> Tuple[int]:
+        # Bin.choose returns an EMS for the list backend and an EMS index for the array backend
+        if isinstance(EMS, (int, np.integer)):
+            return tuple(bin.EMS_block[EMS, :3].tolist())
+        return EMS[0]
+
+    def select(self, bin: Placement.Bin, rotations: List[Tuple[int, Tuple[int]]]) -> Optional[Tuple[int, Tuple[int], object, Tuple[int]]]:
+        """
+        - Return the (orientation, size, EMS, position) with the largest FTR distance in the bin, or None if the item does not fit.
+        """
+        selected, max_distance = None, -1
+        for orientation, size in rotations:
+            if not bin.can_fit(size):
+                continue
+            EMS = bin.choose(size)
+            if EMS is None:
+                continue
+            position = self.position(bin, EMS)
+            distance = sum((self.bin_size[i] - position[i] - size[i]) ** 2 for i in range(3))
+            if distance > max_distance:
+                selected, max_distance = (orientation, size, EMS, position), distance
+        return selected
+
+    def close(self, position: int = None) -> None:
+        """
+        - Close the open bin at the given position, or the one chosen by the closing policy.
+        """
+        if position is None and self.policy == 'oldest':
+            position = 0
+        elif position is None:
+            position = max(range(len(self.open_bins)), key=lambda i: self.open_bins[i][1].load)
+        index, bin = self.open_bins.pop(position)
+        self.closed_loads.append(bin.load)
+        if self.on_close is not None:
+            self.on_close(index, bin)
+
+    def place(self, item: Tuple[int]) -> Tuple[int, Tuple[int], int]:
+        """
+        - Place one item and return the index of its bin, the position of its min corner and its orientation.
+        """
+        start = time.perf_counter()
+        rotations = self.rotations(tuple(item))
+
+        selected, selected_bin, bin_index = None, None, None
+        for index, bin in self.open_bins:
+            selected = self.select(bin, rotations)
+            if selected is not None:
+                selected_bin, bin_index = bin, index
+                break
+
+        if selected is None:
+            bin = self.Bin(self.bin_size, 'difference')
+            selected = self.select(bin, rotations)
+            if selected is None:
+                raise ValueError(f'Item {item} does not fit in an empty bin in any allowed orientation')
+            if len(self.open_bins) == self.max_open_bins:
+                self.close()
+            selected_bin, bin_index = bin, self.used_bins
+            self.open_bins.append((bin_index, bin))
+            self.used_bins += 1
+
+        orientation, size, EMS, position = selected
+        selected_bin.update(size, EMS, self.min_size)
+        self.n_items += 1
+
+        self.latencies[self.n_latencies % len(self.latencies)] = time.perf_counter() - start
+        self.n_latencies += 1
+        return bin_index, position, orientation
+
+    def pack(self, items: Iterable[Tuple[int]]) -> Iterator[Tuple[int, Tuple[int], int]]:
+        """
+        - Place items as they arrive from an iterator, yielding each placement immediately.
+        """
+        for item in items:
+            yield self.place(item)
+
+    async def pack_async(self, items: AsyncIterable[Tuple[int]]) -> AsyncIterator[Tuple[int, Tuple[int], int]]:
+        """
+        - Place items as they arrive from an async stream. Each placement is short and bounded, so it runs in the event loop.
+        """
+        async for item in items:
+            yield self.place(item)
+
+    def flush(self) -> None:
+        """
+        - Close all open bins (e.g. at the end of a shift).
+        """
+        while self.open_bins:
+            self.close(0)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        - Latency statistics (in microseconds) over the most recent items, and packing counters.
+        """
+        latencies = 1e6 * self.latencies[:min(self.n_latencies, len(self.latencies))]
+        stats = {'items': self.n_items, 'used_bins': self.used_bins, 'open_bins': len(self.open_bins)}
+        if latencies.size:
+            stats.update({
+                'mean_us': float(latencies.mean()),
+                'p50_us': float(np.percentile(latencies, 50)),
+                'p95_us': float(np.percentile(latencies, 95)),
+                'p99_us': float(np.percentile(latencies, 99)),
+                'max_us': float(latencies.max())
+            })
+        return stats
+
+if 11 < 3:
+    from problem import Problem
+    problem = Problem('Data/Dataset/20_5_1.dat')
+    packer = OnlinePacker(problem.bin_size, max_open_bins=2)
+    for item, (bin_index, position, orientation) in zip(problem.items, packer.pack(problem.items)):
+        print(f'Item: {item} | Bin: {bin_index} | Position: {position} | Orientation: {orientation}')
+    print(packer.stats())
@@ -1,6 +1,14 @@
+import time
+import asyncio
 import numpy as np
-from typing import List, Tuple, Callable
+from typing import List, Tuple, Dict, Union, Callable, Iterator
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from problem import Problem, Placement
+from evaluator import Evaluator
+from cache import FitnessCache
+from callbacks import Callback, Instrumentation
+from localsearch import LocalSearch
+import checkpoint
 from functools import partial
 from tqdm import tqdm
 
@@ -11,15 +19,8 @@ We implement a genetic algorithm to solve the 3D bin packing problem.
 - This approach significantly reduces the search space and computational complexity.
 """
 
-# Use singleton technique as a Configuration class to store global parameters
+# The Configuration stores the parameters of one solve, and is passed explicitly to its Optimizer and Population
 class Configuration:
-    _instance = None
-
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = super(Configuration, cls).__new__(cls)
-        return cls._instance
-    
     def __init__(self,
                  objective_function: Callable[[List[float]], float] = None,
                  n_items: int = None,
@@ -29,24 +30,42 @@ class Configuration:
                  p_crossover: float = None,
                  p_mutation: float = None,
                  problem: Problem = None,
-                 verbose: bool = False):
-        if not hasattr(self, 'initialized'):
-            self.objective_function = objective_function
-            self.n_items = n_items
-            self.n_individuals = n_individuals
-            self.n_elites = n_elites
-            self.n_generations = n_generations
-            self.p_crossover = p_crossover
-            self.p_mutation = p_mutation
-            self.problem = problem
-            self.verbose = verbose
-            self.initialized = True
-
-    @classmethod
-    def reset(cls):
-        if cls._instance:
-            cls._instance.initialized = False
-        cls._instance = None
+                 verbose: bool = False,
+                 executor: str = 'serial',
+                 n_workers: int = None,
+                 chunk_size: int = 1,
+                 population: str = 'list',
+                 cache_entries: int = None,
+                 cache_bytes: int = None,
+                 prune: bool = False,
+                 early_stop: bool = True,
+                 initial_chromosomes: np.ndarray = None,
+                 seed_fraction: float = 0.0,
+                 local_search: LocalSearch = None):
+        self.objective_function = objective_function
+        self.n_items = n_items
+        self.n_individuals = n_individuals
+        self.n_elites = n_elites
+        self.n_generations = n_generations
+        self.p_crossover = p_crossover
+        self.p_mutation = p_mutation
+        self.problem = problem
+        self.verbose = verbose
+        self.executor = executor
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+        self.population = population
+        self.cache_entries = cache_entries
+        self.cache_bytes = cache_bytes
+        self.prune = prune
+        self.early_stop = early_stop
+        # Heuristic chromosomes (e.g. from sweepbox) seeding this fraction of the initial population
+        self.initial_chromosomes = initial_chromosomes
+        self.seed_fraction = seed_fraction
+        if not 0 <= seed_fraction <= 1:
+            raise ValueError('Seed fraction must be between 0 and 1')
+        # Local search polishing the best individuals of each generation (see localsearch.py)
+        self.local_search = local_search
 
 class Individual:
     """
@@ -68,17 +87,22 @@ class Individual:
     - Chromosome: [0.8, 0.3, 0.6, 0.9, 0.4]
     - Orientation of items: [5, 2, 4, 6, 3]
     """
-    def __init__(self, chromosome: List[float]):
-        # Access the unique instance of Configuration class to get global parameters
-        self.cofig = Configuration()
-
+    def __init__(self, chromosome: List[float], fitness: float = None, objective_function: Callable[[List[float]], float] = None):
         self.chromosome = chromosome
-        self.fitness = self.cofig.objective_function(chromosome)
+        # The fitness is computed here unless it has already been evaluated in a batch
+        self.fitness = objective_function(chromosome) if fitness is None else fitness
 
 class Population:
-    def __init__(self):
-        # Access the unique instance of Configuration class to get global parameters
-        self.cofig = Configuration()
+    def __init__(self, config: Configuration, evaluator: Evaluator = None, rng: np.random.RandomState = None):
+        """
+        Parameters:
+        :param config: Parameters of the solve
+        :param evaluator: Evaluator of the chromosomes (serial evaluation of the objective function by default)
+        :param rng: Random number generator of the solve (the global NumPy generator by default)
+        """
+        self.cofig = config
+        self.evaluator = evaluator or Evaluator(self.cofig.objective_function)
+        self.rng = rng if rng is not None else np.random
 
         self.n_items = self.cofig.n_items
         self.n_individuals = self.cofig.n_individuals
@@ -94,15 +118,65 @@ class Population:
         self.individuals: List[Individual] = []
         self.elites: List[Individual] = []
         self.non_elites: List[Individual] = []
+
+        # Set by the Optimizer when callbacks are registered
+        self.instrumentation: Instrumentation = None
+
+    def fitness(self, chromosomes: List[List[float]], cutoff: float = None) -> List[float]:
+        """
+        - Evaluate a batch of chromosomes through the evaluator.
+        - Chromosomes that cannot beat the cutoff may be given an infinite fitness.
+        - Parallel executors do not record the best solution in this process (or race on it),
+          so the best chromosome of the batch is decoded again here, exactly as a serial run would record it.
+        """
+        start = time.perf_counter() if self.instrumentation is not None else None
+        problem = self.cofig.problem
+        best_fitness = problem.best_fitness if problem is not None else None
+        fitnesses = self.evaluator.evaluate(chromosomes, cutoff)
+
+        if self.evaluator.executor != 'serial' and problem is not None and len(chromosomes):
+            best = int(np.argmin(fitnesses))
+            if fitnesses[best] < best_fitness:
+                problem.best_fitness = best_fitness
+                self.cofig.objective_function(chromosomes[best])
+
+        if self.instrumentation is not None:
+            self.instrumentation.evaluated(chromosomes, fitnesses, time.perf_counter() - start)
+        return fitnesses
+
+    def evaluate(self, chromosomes: List[List[float]], cutoff: float = None) -> List[Individual]:
+        """
+        - Evaluate a batch of chromosomes and wrap them as individuals.
+        """
+        return [Individual(chromosome, fitness) for chromosome, fitness in zip(chromosomes, self.fitness(chromosomes, cutoff))]
         
     def initialize(self):
         """
-        - Initialize the population by uniformly sampling the chromosome space.
+        - Initialize the population by uniformly sampling the chromosome space, then seed it with heuristic chromosomes (see warm_start).
+        """
+        chromosomes = [self.rng.rand(2 * self.n_items) for _ in range(self.n_individuals)]
+        self.individuals = self.evaluate(list(self.warm_start(chromosomes)))
+
+    def warm_start(self, chromosomes: List[List[float]]) -> List[List[float]]:
+        """
+        - Replace the first seed_fraction of the sampled chromosomes by the initial chromosomes of the configuration, in turn.
+        - Further copies of an initial chromosome have their order genes shifted by about one position, so they differ.
+        - Without initial chromosomes, the sampled chromosomes are returned unchanged and no random number is drawn.
         """
-        for _ in range(self.n_individuals):
-            chromosome = np.random.rand(2 * self.n_items)
-            individual = Individual(chromosome)
-            self.individuals.append(individual)
+        initial = self.cofig.initial_chromosomes
+        n_seeded = int(self.cofig.seed_fraction * self.n_individuals) if initial is not None else 0
+        if n_seeded == 0:
+            return chromosomes
+
+        initial = np.asarray(initial, dtype=float).reshape(-1, self.n_genes)
+        chromosomes = np.array(chromosomes, dtype=float)
+        for i in range(n_seeded):
+            chromosome = initial[i % len(initial)].copy()
+            if i >= len(initial):
+                shift = self.rng.normal(0, 1 / self.n_items, self.n_items)
+                chromosome[:self.n_items] = np.clip(chromosome[:self.n_items] + shift, 0, 1)
+            chromosomes[i] = chromosome
+        return chromosomes
 
     def partition(self):
         """
@@ -113,67 +187,275 @@ class Population:
         self.elites = [self.individuals[i] for i in indices[:self.n_elites]]
         self.non_elites = [self.individuals[i] for i in indices[self.n_elites:]]
 
-    def crossover(self, elite: Individual, non_elite: Individual) -> Individual:
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        - Return the chromosomes and fitnesses of the current individuals as arrays.
+        """
+        return np.array([individual.chromosome for individual in self.individuals]), \
+               np.array([individual.fitness for individual in self.individuals], dtype=float)
+
+    def restore(self, chromosomes: np.ndarray, fitnesses: np.ndarray) -> None:
+        """
+        - Replace the individuals by already evaluated ones (e.g. from a checkpoint), in the given order.
+        """
+        self.individuals = [Individual(chromosome, fitness) for chromosome, fitness in zip(chromosomes, fitnesses.tolist())]
+
+    def best(self, n: int) -> Tuple[List[List[float]], List[float]]:
+        """
+        - Return the chromosomes and fitnesses of the n best individuals (after partitioning).
+        """
+        return [individual.chromosome for individual in self.elites[:n]], [individual.fitness for individual in self.elites[:n]]
+
+    def update_best(self, ranks: List[int], chromosomes: List[List[float]], fitnesses: List[float]) -> None:
+        """
+        - Replace the individuals of the given ranks (after partitioning) by improved ones (e.g. from the local search)
+          and partition again, since the improved individuals may change rank.
+        """
+        for rank, chromosome, fitness in zip(ranks, chromosomes, fitnesses):
+            self.individuals[self.individuals.index(self.elites[rank])] = Individual(chromosome, fitness)
+        self.partition()
+
+    def replace_worst(self, chromosomes: List[List[float]], fitnesses: List[float]) -> None:
+        """
+        - Replace the worst individuals by already evaluated ones (e.g. migrants) and partition again.
+        """
+        migrants = [Individual(chromosome, fitness) for chromosome, fitness in zip(chromosomes, fitnesses)]
+        self.individuals = self.elites + self.non_elites[:len(self.non_elites) - len(migrants)] + migrants
+        self.partition()
+
+    def cutoff(self) -> float:
+        """
+        - With pruning, new individuals only need an exact fitness if they can beat the worst elite:
+          the elites stay in the population, so any other individual can not become an elite.
+        - Pruned individuals get an infinite fitness, which changes the order of the non-elites that parent selection
+          draws from. A run with prune=True therefore gives different results than the same seed without pruning.
+        """
+        return self.elites[-1].fitness if self.cofig.prune and self.elites else None
+
+    def crossover(self, elite: Individual, non_elite: Individual) -> List[float]:
         """
         - Crossover is performed between one elite and one non-elite individual.
         - Each gene is randomly chosen from either parent with a probability of p_crossover. 
+        - The offspring chromosome is returned unevaluated.
         """
 
         offspring = [0] * (self.n_genes)
 
         for i in range(self.n_genes):
-            if np.random.rand() < self.p_crossover:
+            if self.rng.rand() < self.p_crossover:
                 offspring[i] = elite.chromosome[i]
             else:
                 offspring[i] = non_elite.chromosome[i]
 
-        return Individual(offspring)
+        return offspring
     
-    def mating(self):
+    def mating(self) -> List[List[float]]:
         """
-        - Mating is performed between elite and non-elite individuals to generate offsprings.
+        - Mating is performed between elite and non-elite individuals to generate offspring chromosomes.
         """
-        offsprings: List[Individual] = []
+        offsprings: List[List[float]] = []
         for _ in range(self.n_offsprings):
-            elite = np.random.choice(self.elites)
-            non_elite = np.random.choice(self.non_elites)
+            elite = self.rng.choice(self.elites)
+            non_elite = self.rng.choice(self.non_elites)
             offspring = self.crossover(elite, non_elite)
             offsprings.append(offspring)
 
         return offsprings
     
-    def mutation(self):
+    def mutation(self) -> List[List[float]]:
         """
-        - Create entirely new individuals by uniformly sampling to increase diversity.
+        - Create entirely new chromosomes by uniformly sampling to increase diversity.
         """
-        mutants: List[Individual] = []
+        mutants: List[List[float]] = []
         for _ in range(self.n_mutants):
-            chromosome = np.random.rand(2 * self.n_items)
-            mutant = Individual(chromosome)
-            mutants.append(mutant)
+            chromosome = self.rng.rand(2 * self.n_items)
+            mutants.append(chromosome)
 
         return mutants
 
+    def next_generation(self, offsprings: List[List[float]], mutants: List[List[float]]) -> None:
+        """
+        - The next generation consists of the elites, the offsprings and the mutants.
+        - All new chromosomes of the generation are evaluated as one batch.
+        """
+        self.individuals = self.elites + self.evaluate(offsprings + mutants, self.cutoff())
+
+class MatrixPopulation(Population):
+    """
+    Population that stores all chromosomes in one (n_individuals x n_genes) array and their fitnesses in one vector.
+    - Parents are selected with index arrays and the crossover of all offsprings is a single np.where.
+    - Random numbers are drawn in the same order as Population, so a given seed gives the same results.
+    """
+    def __init__(self, config: Configuration, evaluator: Evaluator = None, rng: np.random.RandomState = None):
+        super().__init__(config, evaluator, rng)
+        self.chromosomes = np.empty((0, self.n_genes))
+        self.fitnesses = np.empty(0)
+        self.order = np.arange(0)
+
+    def initialize(self):
+        """
+        - Initialize the population by uniformly sampling the chromosome space, then seed it with heuristic chromosomes (see warm_start).
+        """
+        self.chromosomes = self.warm_start(self.rng.rand(self.n_individuals, self.n_genes))
+        self.fitnesses = np.asarray(self.fitness(self.chromosomes), dtype=float)
+
+    def partition(self):
+        """
+        - Sort the population by fitness: the first n_elites rows of the order are the elites.
+        - A full argsort (rather than an argpartition) keeps the order of non-elites, on which parent selection depends.
+        """
+        self.order = np.argsort(self.fitnesses)
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.chromosomes, self.fitnesses
+
+    def restore(self, chromosomes: np.ndarray, fitnesses: np.ndarray) -> None:
+        self.chromosomes = np.array(chromosomes, dtype=float)
+        self.fitnesses = np.array(fitnesses, dtype=float)
+
+    def best(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        return self.chromosomes[self.order[:n]], self.fitnesses[self.order[:n]]
+
+    def update_best(self, ranks: List[int], chromosomes: np.ndarray, fitnesses: np.ndarray) -> None:
+        if len(ranks) == 0:
+            return
+        improved = self.order[np.asarray(ranks)]
+        self.chromosomes[improved] = chromosomes
+        self.fitnesses[improved] = fitnesses
+        self.partition()
+
+    def replace_worst(self, chromosomes: np.ndarray, fitnesses: np.ndarray) -> None:
+        if len(chromosomes) == 0:
+            return
+        worst = self.order[-len(chromosomes):]
+        self.chromosomes[worst] = chromosomes
+        self.fitnesses[worst] = fitnesses
+        self.partition()
+
+    def cutoff(self) -> float:
+        return self.fitnesses[self.order[self.n_elites - 1]] if self.cofig.prune and self.n_elites else None
+
+    def mating(self) -> np.ndarray:
+        """
+        - Draw the parents and gene masks of all offsprings, then cross them over at once.
+        """
+        n_non_elites = self.n_individuals - self.n_elites
+        elites = np.empty(self.n_offsprings, dtype=int)
+        non_elites = np.empty(self.n_offsprings, dtype=int)
+        masks = np.empty((self.n_offsprings, self.n_genes), dtype=bool)
+        for i in range(self.n_offsprings):
+            elites[i] = self.rng.randint(self.n_elites)
+            non_elites[i] = self.rng.randint(n_non_elites)
+            masks[i] = self.rng.rand(self.n_genes) < self.p_crossover
+
+        elites = self.order[elites]
+        non_elites = self.order[self.n_elites + non_elites]
+        return np.where(masks, self.chromosomes[elites], self.chromosomes[non_elites])
+
+    def mutation(self) -> np.ndarray:
+        """
+        - Create entirely new chromosomes by uniformly sampling to increase diversity.
+        """
+        return self.rng.rand(self.n_mutants, self.n_genes)
+
+    def next_generation(self, offsprings: np.ndarray, mutants: np.ndarray) -> None:
+        """
+        - The next generation consists of the elites, the offsprings and the mutants.
+        """
+        elites = self.order[:self.n_elites]
+        chromosomes = np.concatenate((offsprings, mutants))
+        fitnesses = np.asarray(self.fitness(chromosomes, self.cutoff()), dtype=float)
+        self.chromosomes = np.concatenate((self.chromosomes[elites], chromosomes))
+        self.fitnesses = np.concatenate((self.fitnesses[elites], fitnesses))
+
 class Optimizer:
-    def __init__(self, **kwargs):
-        self.config = Configuration()
-        self.population = Population()
+    def __init__(self, config: Configuration, seed: int = None, rng: np.random.RandomState = None, **kwargs):
+        """
+        Parameters:
+        :param config: Parameters of the solve
+        :param seed: Seed of a random number generator owned by this solve
+        :param rng: Random number generator of this solve (overrides the seed)
+        Without a seed or a generator, the global NumPy generator is used, as in a script seeded with np.random.seed.
+
+        Keyword arguments:
+        :param frequency: Number of generations between two progress prints (verbose mode)
+        :param use_tqdm: Show a progress bar
+        :param callbacks: List of Callback notified during the run (see callbacks.py, checkpoint.py)
+        """
+        self.config = config
+        self.rng = rng if rng is not None else (np.random.RandomState(seed) if seed is not None else np.random)
+        self.cache = None
+        if self.config.cache_entries is not None or self.config.cache_bytes is not None:
+            self.cache = FitnessCache(max_entries=self.config.cache_entries, max_bytes=self.config.cache_bytes)
+        self.evaluator = Evaluator(self.config.objective_function,
+                                   self.config.executor,
+                                   self.config.n_workers,
+                                   self.config.chunk_size,
+                                   self.cache)
+        self.population = (MatrixPopulation if self.config.population == 'matrix' else Population)(self.config, self.evaluator, self.rng)
 
         self.n_generations = self.config.n_generations
+        self.start_generation = 0
+        self.restored = False
 
         self.frequency = kwargs.get('frequency', 100)
         self.use_tqdm = kwargs.get('use_tqdm', False)
 
+        self.callbacks: List[Callback] = kwargs.get('callbacks', [])
+        self.instrumentation = Instrumentation(self, self.callbacks)
+        if self.instrumentation.enabled:
+            self.population.instrumentation = self.instrumentation
+
+    def reached_bound(self) -> bool:
+        """
+        - No solution can use fewer bins than the lower bound of the problem, so the search can stop once it is reached.
+        """
+        problem = self.config.problem
+        return problem is not None and problem.used_bins <= problem.lower_bound
+
+    def restore(self, path: str) -> None:
+        """
+        - Resume from a checkpoint: the population, the random number generator and the best solution are restored,
+          and optimize continues with the generation after the checkpointed one.
+        """
+        state = checkpoint.load(path)
+        self.start_generation = checkpoint.restore(state, self) + 1
+        self.restored = True
+
     def optimize(self):
-        self.population.initialize()
-        loop = tqdm(range(self.n_generations)) if self.use_tqdm else range(self.n_generations)
-        for generation in loop:
-            self.population.partition()
-            if self.config.verbose and generation % self.frequency == 0:
-                print(f'Best fitness: {self.config.problem.best_fitness} | Number of bins used: {self.config.problem.used_bins} | Loads: {self.config.problem.loads}')
-            offsprings = self.population.mating()
-            mutants = self.population.mutation()
-            self.population.individuals = self.population.elites + offsprings + mutants
+        instrumentation = self.instrumentation
+        with self.evaluator:
+            instrumentation.start()
+            if not self.restored:
+                instrumentation.begin(-1)
+                self.population.initialize()
+                instrumentation.end()
+
+            generations = range(self.start_generation, self.n_generations)
+            loop = tqdm(generations) if self.use_tqdm else generations
+            for generation in loop:
+                instrumentation.begin(generation)
+                with instrumentation.section('partition'):
+                    self.population.partition()
+                if self.config.verbose and generation % self.frequency == 0:
+                    print(f'Best fitness: {self.config.problem.best_fitness} | Number of bins used: {self.config.problem.used_bins} | Loads: {self.config.problem.loads}')
+                if self.config.early_stop and self.reached_bound():
+                    if self.config.verbose:
+                        print(f'Stopped at generation {generation}: {self.config.problem.used_bins} bins is the lower bound')
+                    break
+                if self.config.local_search is not None:
+                    with instrumentation.section('local_search'):
+                        self.config.local_search(self.population, self.rng)
+                # All chromosomes of the generation are built first, then evaluated as one batch
+                with instrumentation.section('mating'):
+                    offsprings = self.population.mating()
+                with instrumentation.section('mutation'):
+                    mutants = self.population.mutation()
+                with instrumentation.section('replacement'):
+                    self.population.next_generation(offsprings, mutants)
+                if instrumentation.end():
+                    break
+            instrumentation.finish()
 
 # Define the objective function to evaluate the fitness of an individual
 """
@@ -182,17 +464,101 @@ In this part, we decode the chromosome of an individual as an placement strategy
 - We choose the EMS for an item based on Distance to the Front-Top-Right Corner (FTR) rule.
 """
 
-def evaluate(solution: List[float], problem: Problem) -> float:
-    placement = Placement(problem)
-    return placement.evaluate(solution)
+def evaluate(solution: List[float], problem: Problem, cutoff: float = None, **kwargs) -> float:
+    placement = Placement(problem, **kwargs)
+    return placement.evaluate(solution, cutoff)
+
+# Solve independent problems
+"""
+Each solve owns its Configuration, Problem and random number generator, so any number of solves can run concurrently:
+- solve runs one problem to completion and returns a summary of its best solution.
+- solve_many schedules many solves on a thread or process pool and yields their results as they complete.
+- solve_async runs one solve in an executor from asyncio code.
+"""
+
+def solve(problem: Union[Problem, str],
+          seed: int = None,
+          n_individuals: int = 100,
+          n_elites: int = 10,
+          n_generations: int = 100,
+          p_crossover: float = 0.5,
+          p_mutation: float = 0.3,
+          placement: Dict[str, object] = None,
+          local_search: Dict[str, object] = None,
+          **kwargs) -> dict:
+    """
+    Parameters:
+    :param problem: Problem, or path of an instance
+    :param seed: Seed of the random number generator of this solve
+    :param placement: Keyword arguments of Placement (backend, update_mode, max_open_bins)
+    :param local_search: Keyword arguments of LocalSearch (n_elites, max_moves, seconds, interval), None to disable it
+    :param kwargs: Other keyword arguments of Configuration (executor, population, cache_entries, prune, ...)
+    """
+    if isinstance(problem, str):
+        problem = Problem(problem)
+    objective_function = partial(evaluate, problem=problem, **(placement or {}))
+    if local_search is not None:
+        kwargs['local_search'] = LocalSearch(problem, **local_search, **(placement or {}))
+    config = Configuration(objective_function, problem.total_items, n_individuals, n_elites, n_generations,
+                           p_crossover, p_mutation, problem, **kwargs)
+    start = time.perf_counter()
+    Optimizer(config, seed=seed).optimize()
+    return {
+        'path': problem.path,
+        'best_fitness': problem.best_fitness,
+        'used_bins': problem.used_bins,
+        'lower_bound': problem.lower_bound,
+        'loads': problem.loads,
+        'solution': problem.solution,
+        'time': time.perf_counter() - start
+    }
+
+def solve_many(problems: List[Union[Problem, str]],
+               seeds: List[int] = None,
+               executor: str = 'process',
+               n_workers: int = None,
+               **kwargs) -> Iterator[Tuple[int, dict]]:
+    """
+    - Yield (index, result) pairs as the solves complete, where index is the position of the problem in the list.
+    - Each solve evaluates serially: the pool itself uses the cores.
+    - Problems given as paths are loaded by the workers.
+
+    Parameters:
+    :param problems: Problems, or paths of instances
+    :param seeds: Seed of each solve (the index of the problem by default)
+    :param executor: 'thread' or 'process'
+    :param n_workers: Number of workers of the pool (defaults to the number of CPUs)
+    :param kwargs: Keyword arguments of solve
+    """
+    if executor not in ('thread', 'process'):
+        raise ValueError(f'Unknown executor: {executor}')
+    seeds = list(range(len(problems))) if seeds is None else seeds
+    if len(seeds) != len(problems):
+        raise ValueError('There must be one seed per problem')
+
+    pool = (ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor)(max_workers=n_workers)
+    with pool:
+        futures = {pool.submit(solve, problem, seed, **kwargs): index for index, (problem, seed) in enumerate(zip(problems, seeds))}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+async def solve_async(problem: Union[Problem, str], seed: int = None, executor: Executor = None, **kwargs) -> dict:
+    """
+    - Run a solve in the given executor (the default executor of the event loop if None) without blocking the event loop.
+    """
+    return await asyncio.get_running_loop().run_in_executor(executor, partial(solve, problem, seed, **kwargs))
         
 if 11 < 3:
-    def solve(path, seed=10):
-        np.random.seed(seed)
+    def solve_path(path, seed=10):
         problem = Problem(path)
         objective_function = partial(evaluate, problem=problem)
-        Configuration(objective_function, problem.total_items, 100, 10, 11, 0.5, 0.3, problem, True)
-        Optimizer(frequency=10, use_tqdm=True).optimize()
+        config = Configuration(objective_function, problem.total_items, 100, 10, 11, 0.5, 0.3, problem, True)
+        Optimizer(config, seed=seed, frequency=10, use_tqdm=True).optimize()
         problem.visualize()
 
-    solve('Data/Dataset/20_1_1.dat', 0)
\ No newline at end of file
+    solve_path('Data/Dataset/20_1_1.dat', 0)
+
+if 11 < 3:
+    paths = ['Data/Dataset/20_1_1.dat', 'Data/Dataset/20_5_1.dat', 'Data/Dataset/20_5_2.dat']
+    for index, result in solve_many(paths, n_generations=50):
+        print(f'{paths[index]}: {result["used_bins"]} bins (lower bound {result["lower_bound"]}) in {result["time"]:.1f} s')
\ No newline at end of file
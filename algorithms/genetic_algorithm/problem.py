@@ -1,9 +1,31 @@
+import copy
+import logging
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-from typing import List, Tuple, Callable, Optional
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+from typing import List, Tuple, Dict, Callable, Iterator, Optional
+from rules import EMS_RULES, BIN_RULES
+from heightmap import HeightMap
+import solutions
+
+logger = logging.getLogger(__name__)
+
+"""
+Instances are stored either as text (.dat) or in a compact binary format:
+- A fixed header (HEADER): magic bytes, format version, bin size, number of bins, number of items per bin, total volume.
+- Followed by the items as a little-endian int32 array of shape (n_bins * n_items, 3).
+Binary instances are opened with np.memmap, so the items are not read or copied until they are used.
+"""
+
+MAGIC = b'BPPI'
+VERSION = 1
+HEADER = np.dtype([
+    ('magic', 'S4'),
+    ('version', '<i4'),
+    ('bin_size', '<i4', (3,)),
+    ('n_bins', '<i4'),
+    ('n_items', '<i4'),
+    ('total_volume', '<i8')
+])
 
 class Problem:
     def __init__(self, path: str):
@@ -13,9 +35,26 @@ class Problem:
         self.used_bins = self.total_items
         self.loads = None
         self.best_fitness = np.inf
-        self.solution: List[List[List[Tuple[int], Tuple[int]]]] = None
+        self.solution: np.ndarray = None # Best solution as a structured array of solutions.SOLUTION
+        self.counters: Optional[Dict[str, int]] = None # Decode counters, only kept while an optimizer is instrumented
+
+    @staticmethod
+    def is_binary(path: str) -> bool:
+        with open(path, 'rb') as file:
+            return file.read(len(MAGIC)) == MAGIC
 
     def load_data(self):
+        if self.is_binary(self.path):
+            self.load_binary()
+        else:
+            self.load_text()
+        self._items = None
+        self._bounds: Optional[Tuple[int, int]] = None
+
+        logger.info(f'Loaded data from {self.path}')
+        logger.info(f'Problem: {self.n_items} items | {self.n_bins} bins | {self.bin_size} | {self.total_volume}')
+
+    def load_text(self):
         with open(self.path, 'r') as file:
             lines = file.readlines()
         
@@ -23,100 +62,215 @@ class Problem:
         self.n_bins = int(lines[1].strip().split()[3])
         self.n_items = int(lines[2].strip().split()[5])
         self.total_volume = int(lines[3].strip().split()[4])
-        self.items = []
-
-        for line in lines[5:]:
-            item = tuple(map(int, line.strip().split()))
-            self.items.append(item)
-
-        print(f'Loaded data from {self.path}')
-        print(f'Problem: {self.n_items} items | {self.n_bins} bins | {self.bin_size} | {self.total_volume}')
-
-    def visualize(self):
-        if not self.solution:
+        self.item_array = np.array([line.split() for line in lines[5:] if line.strip()], dtype=np.int32).reshape(-1, 3)
+
+    def load_binary(self):
+        header = np.fromfile(self.path, dtype=HEADER, count=1)[0]
+        if header['version'] != VERSION:
+            raise ValueError(f'Unsupported instance format version: {header["version"]}')
+
+        self.bin_size = tuple(map(int, header['bin_size']))
+        self.n_bins = int(header['n_bins'])
+        self.n_items = int(header['n_items'])
+        self.total_volume = int(header['total_volume'])
+        self.item_array = np.memmap(self.path, dtype='<i4', mode='r', offset=HEADER.itemsize, shape=(self.n_bins * self.n_items, 3))
+
+    @property
+    def items(self) -> List[Tuple[int]]:
+        # Built from the item array on first use only, since the placement engine reads the array directly
+        if self._items is None:
+            self._items = list(map(tuple, self.item_array.tolist()))
+        return self._items
+
+    def save_binary(self, path: str) -> None:
+        header = np.zeros(1, dtype=HEADER)
+        header['magic'] = MAGIC
+        header['version'] = VERSION
+        header['bin_size'] = self.bin_size
+        header['n_bins'] = self.n_bins
+        header['n_items'] = self.n_items
+        header['total_volume'] = self.total_volume
+        with open(path, 'wb') as file:
+            file.write(header.tobytes())
+            file.write(np.ascontiguousarray(self.item_array, dtype='<i4').tobytes())
+
+    BOUNDS_CHUNK = 1 << 20 # Items read at once to compute the bounds
+
+    def compute_bounds(self) -> Tuple[int, int]:
+        """
+        Lower bounds on the number of bins, valid for any orientation of the items.
+        - Volume bound (L1): ceil(total volume / bin volume).
+        - Large-item bound (L2): an item whose smallest dimension exceeds half of the largest bin dimension cannot share
+          a bin with another such item, and the other items can only use the space left in their bins before opening new ones.
+        - The items are read in chunks, so a memory-mapped instance is never copied as a whole.
+        """
+        bin_volume = self.bin_size[0] * self.bin_size[1] * self.bin_size[2]
+        volume_bound = -(-self.total_volume // bin_volume)
+
+        n_large, large_volume = 0, 0
+        for first in range(0, len(self.item_array), self.BOUNDS_CHUNK):
+            items = np.asarray(self.item_array[first:first + self.BOUNDS_CHUNK], dtype=np.int64)
+            large = items[2 * items.min(axis=1) > max(self.bin_size)]
+            n_large += len(large)
+            large_volume += int(large.prod(axis=1).sum())
+        small_volume = self.total_volume - large_volume
+        free_volume = n_large * bin_volume - large_volume
+        large_item_bound = n_large + -(-max(0, small_volume - free_volume) // bin_volume)
+        return volume_bound, large_item_bound
+
+    @property
+    def volume_bound(self) -> int:
+        return self.bounds[0]
+
+    @property
+    def large_item_bound(self) -> int:
+        return self.bounds[1]
+
+    @property
+    def lower_bound(self) -> int:
+        return max(self.bounds)
+
+    @property
+    def bounds(self) -> Tuple[int, int]:
+        # Computed on first use only, since it reads every item of the instance
+        if self._bounds is None:
+            self._bounds = self.compute_bounds()
+        return self._bounds
+
+    def boxes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        - The placed items of the best solution as rows (x1, y1, z1, x2, y2, z2), offset along x by the position of their bin,
+          and the bin index of each item.
+        """
+        if self.solution is None or not len(self.solution):
             raise ValueError('No solution found')
-        
-        def plot_box(ax, x0: int, y0: int, z0: int, x1: int, y1: int, z1: int, color) -> None:
-            dx, dy, dz = x1 - x0, y1 - y0, z1 - z0
-            vertices = [
-                [x0, y0, z0], [x0 + dx, y0, z0], [x0 + dx, y0 + dy, z0], [x0, y0 + dy, z0],
-                [x0, y0, z0 + dz], [x0 + dx, y0, z0 + dz], [x0 + dx, y0 + dy, z0 + dz], [x0, y0 + dy, z0 + dz]
-            ]
-            
-            faces = [
-                [vertices[j] for j in [0, 1, 5, 4]],
-                [vertices[j] for j in [7, 6, 2, 3]],
-                [vertices[j] for j in [0, 3, 7, 4]],
-                [vertices[j] for j in [1, 2, 6, 5]],
-                [vertices[j] for j in [0, 1, 2, 3]],
-                [vertices[j] for j in [4, 5, 6, 7]]
-            ]
-            
-            poly3d = Poly3DCollection(faces, facecolors=color, linewidths=0.5, edgecolors='k', alpha=0.2, zsort='average')
-            ax.add_collection3d(poly3d)
-
-        fig = plt.figure(figsize=(9, 5))
-        ax = fig.add_subplot(111, projection='3d')
-
-        # Create a color palette for items
-        flat_items = [item for bin_items in self.solution for item in bin_items]
-        colors = sns.color_palette("Set3", len(flat_items))
-
-        item_count = 0
-        for bin_idx, bin_items in enumerate(self.solution):
-            bin_origin_x = bin_idx * self.bin_size[0]
-            for item in bin_items:
-                (x0, y0, z0), (x1, y1, z1) = item
-                x0 += bin_origin_x
-                x1 += bin_origin_x
-                color = colors[item_count % len(colors)]
-                plot_box(ax, x0, y0, z0, x1, y1, z1, color)
-                item_count += 1
-
-        ax.set_xlabel('X')
-        ax.set_ylabel('Y')
-        ax.set_zlabel('Z')
-
-        # Set limits for the axes
-        ax.set_xlim([0, self.bin_size[0] * self.used_bins])
-        ax.set_ylim([0, self.bin_size[1]])
-        ax.set_zlim([0, self.bin_size[2]])
-
-        ax.title.set_text('3D Bin Packing Visualization')
-        ax.set_box_aspect([self.bin_size[0] * self.used_bins, self.bin_size[1], self.bin_size[2]])
-        
-        # Add a legend with information
-        info_text = (
-            f'Bin size: {self.bin_size}\n'
-            f'Number of bins: {self.used_bins}'
-        )
-        plt.figtext(0.75, 0.5, info_text, fontsize=8, ha='left', va='center', bbox=dict(facecolor='white', edgecolor='black'))
-
-        plt.show()
+        bins = self.solution['bin'].astype(np.int64)
+        boxes = solutions.boxes(self.solution).astype(float)
+        boxes[:, [0, 3]] += (bins * self.bin_size[0])[:, None]
+        return boxes, bins
+
+    def visualize(self, path: str = None, max_items: int = None, bins_per_page: int = None) -> None:
+        """
+        Parameters:
+        :param path: Image file to save (PNG, SVG, ...) without opening a window; the figure is shown if None
+        :param max_items: Only draw the largest items if there are more (per image)
+        :param bins_per_page: Draw this many bins per image, saved as path_0, path_1, ... (or shown one after another)
+        """
+        from render import render, page_path
+
+        boxes, bins = self.boxes()
+        n_bins = int(bins.max()) + 1
+        per_page = bins_per_page or n_bins
+        for page, first in enumerate(range(0, n_bins, per_page)):
+            last = min(first + per_page, n_bins)
+            selected = (bins >= first) & (bins < last)
+            page_boxes = boxes[selected] - np.array([first * self.bin_size[0], 0, 0] * 2)[None, :]
+
+            info_text = f'Bin size: {self.bin_size}\nNumber of bins: {self.used_bins}'
+            if per_page < n_bins:
+                info_text += f'\nBins shown: {first} to {last - 1}'
+            render(page_boxes, self.bin_size, last - first,
+                   path=page_path(path, page) if path and per_page < n_bins else path,
+                   info_text=info_text, max_boxes=max_items)
+
+    def export_obj(self, path: str) -> None:
+        """
+        - Export the placed items of the best solution as an OBJ mesh, with one group per bin.
+        """
+        from render import export_obj
+
+        boxes, bins = self.boxes()
+        export_obj(boxes, path, bins.tolist())
+
+    def save_solution(self, path: str) -> None:
+        """
+        - Save the best solution as CSV if the path ends with .csv, in the binary solution format otherwise (see solutions.py).
+        """
+        if self.solution is None:
+            raise ValueError('No solution found')
+        if path.lower().endswith('.csv'):
+            solutions.save_csv(self.solution, path)
+        else:
+            solutions.save_binary(self.solution, path, self.bin_size)
+
+    def validate(self) -> List[str]:
+        """
+        - Check that the best solution places every item once, in its bin, without overlaps. Return the violations.
+        """
+        if self.solution is None:
+            raise ValueError('No solution found')
+        return solutions.validate(self.solution, self.bin_size, self.item_array)
     
 class Placement:
     class Bin:
-        def __init__(self, size: Tuple[int]):
+        """
+        Each bin keeps its EMSs up to date with one of two update modes:
+        - 'split': only the selected EMS is split, so other EMSs may overlap placed items and every candidate is checked against them.
+        - 'difference': every EMS that intersects the new item is split (difference process), so EMSs stay truly empty.
+        The EMS of an item is chosen by an EMS rule of rules.EMS_RULES ('dftrc' by default).
+        A bin given a HeightMap (see heightmap.py) raises the footprint of each placed item in it.
+        """
+        def __init__(self, size: Tuple[int], update_mode: str = 'split', rule: str = 'dftrc', height_map: HeightMap = None):
             self.size = size
+            self.update_mode = update_mode
+            self.rule = rule
+            self.height_map = height_map
             self.EMSs: List[List[Tuple[int]]] = [
                 [(0, 0, 0), size] # Each EMS is a list of 2 tuples, the first one is always like this
             ]
             self.items: List[List[Tuple[int]]] = []
             self.load = 0
+            self.summarize()
+
+        @property
+        def n_EMSs(self) -> int:
+            return len(self.EMSs)
+
+        # Keep the largest EMS extent along each axis and the remaining volume to skip bins that cannot hold an item
+        def summarize(self) -> None:
+            self.max_extents = tuple(max((EMS[1][i] - EMS[0][i] for EMS in self.EMSs), default=0) for i in range(3))
+            self.free_volume = self.size[0] * self.size[1] * self.size[2] - self.load
+
+        def can_fit(self, item: Tuple[int]) -> bool:
+            return item[0] * item[1] * item[2] <= self.free_volume and all(item[i] <= self.max_extents[i] for i in range(3))
+
+        # Placed items as rows (x1, y1, z1, x2, y2, z2)
+        def boxes(self) -> np.ndarray:
+            return np.array(self.items, dtype=np.int32).reshape(-1, 6)
+
+        def copy(self) -> 'Placement.Bin':
+            # EMSs and items are never modified in place, so copying the outer lists is enough
+            bin = copy.copy(self)
+            bin.EMSs = list(self.EMSs)
+            bin.items = list(self.items)
+            if self.height_map is not None:
+                bin.height_map = self.height_map.copy()
+            return bin
 
         # Return the EMS is chosen to place the item based on Distance to Front-Top-Right Corner (FTR) rule
         def choose(self, item: Tuple[int]) -> Tuple[int]:
+            if self.rule != 'dftrc':
+                return self.choose_by_rule(item)
             max_distance = -1
             selected_EMS = None
             for EMS in self.EMSs:
                 # print(f'Fit: {self.fit(item, EMS)} | Check: {self.check(item, EMS)}')
-                if self.fit(item, EMS) and self.check(item, EMS): 
+                if self.fit(item, EMS) and (self.update_mode == 'difference' or self.check(item, EMS)): 
                     x, y, z = EMS[0][0] + item[0], EMS[0][1] + item[1], EMS[0][2] + item[2]
                     distance = (self.size[0] - x) ** 2 + (self.size[1] - y) ** 2 + (self.size[2] - z) ** 2
                     if distance > max_distance:
                         max_distance = distance
                         selected_EMS = EMS
             return selected_EMS
+
+        # Return the EMS chosen by the EMS rule among all EMSs that can hold the item
+        def choose_by_rule(self, item: Tuple[int]) -> Tuple[int]:
+            candidates = [EMS for EMS in self.EMSs if self.fit(item, EMS) and (self.update_mode == 'difference' or self.check(item, EMS))]
+            if not candidates: return None
+            EMSs = np.array([EMS[0] + EMS[1] for EMS in candidates]).reshape(-1, 6)
+            items = np.array([placed[0] + placed[1] for placed in self.items]).reshape(-1, 6)
+            scores = EMS_RULES[self.rule](EMSs, np.asarray(item), np.asarray(self.size), items)
+            return candidates[int(np.argmax(scores))]
         
         # Check if the item can be placed into the chosen EMS
         def check(self, item: List[Tuple[int]], EMS: List[Tuple[int]]) -> bool:
@@ -142,13 +296,46 @@ class Placement:
         def inscribed(EMS1: List[Tuple[int]], EMS2: List[Tuple[int]]) -> bool:
             return np.all(np.array(EMS1[0]) >= np.array(EMS2[0])) and np.all(np.array(EMS1[1]) <= np.array(EMS2[1])) # EMS1 is inscribed in EMS2
 
+        # Split every EMS intersecting the placed item and keep the maximal children that can still hold an item
+        def difference(self, space: List[Tuple[int]], min_size: int) -> None:
+            (p1, p2, p3), (q1, q2, q3) = space
+            new_EMSs = []
+            kept_EMSs = []
+            for EMS in self.EMSs:
+                if not self.overlapped(EMS, space):
+                    kept_EMSs.append(EMS)
+                    continue
+                (a1, a2, a3), (b1, b2, b3) = EMS
+                new_EMSs += [
+                    [(a1, a2, a3), (p1, b2, b3)], [(q1, a2, a3), (b1, b2, b3)],
+                    [(a1, a2, a3), (b1, p2, b3)], [(a1, q2, a3), (b1, b2, b3)],
+                    [(a1, a2, a3), (b1, b2, p3)], [(a1, a2, q3), (b1, b2, b3)]
+                ]
+
+            new_EMSs = [EMS for EMS in new_EMSs if min(EMS[1][i] - EMS[0][i] for i in range(3)) >= max(min_size, 1)]
+            self.EMSs = kept_EMSs
+            for i, EMS in enumerate(new_EMSs):
+                if any(self.inscribed(EMS, other_EMS) for other_EMS in kept_EMSs): continue
+                # Among identical children only the first one is kept
+                if any(self.inscribed(EMS, other_EMS) and (j < i or not self.inscribed(other_EMS, EMS))
+                       for j, other_EMS in enumerate(new_EMSs) if j != i): continue
+                self.EMSs.append(EMS)
+
         # Update EMSs after placing the item into the chosen EMS
-        def update(self, item: Tuple[int], selected_EMS: Tuple[int]) -> None:
+        def update(self, item: Tuple[int], selected_EMS: Tuple[int], min_size: int = 0) -> None:
             x1, y1, z1 = selected_EMS[0]
             x2, y2, z2 = x1 + item[0], y1 + item[1], z1 + item[2]
             x3, y3, z3 = selected_EMS[1]
 
             self.items.append([(x1, y1, z1), (x2, y2, z2)])
+            self.load += item[0] * item[1] * item[2]
+            if self.height_map is not None:
+                self.height_map.update((x1, y1, z1, x2, y2, z2))
+
+            if self.update_mode == 'difference':
+                self.difference(self.items[-1], min_size)
+                self.summarize()
+                return
 
             new_EMSs = [
                 [(x2, y1, z1), (x3, y3, z3)],
@@ -172,20 +359,232 @@ class Placement:
                 if isValid:
                     self.EMSs.append(EMS)
 
+            self.summarize()
+
+    class ArrayBin:
+        """
+        Array-backed variant of Bin that produces exactly the same placements.
+        - EMSs and placed items are rows (x1, y1, z1, x2, y2, z2) of preallocated int32 blocks.
+        - The blocks double in size when they run out of rows.
+        - Fit, overlap and FTR scoring are done for all EMSs in one vectorized pass.
+        - Both update modes of Bin are supported, and a HeightMap is updated as in Bin.
+        """
+        def __init__(self, size: Tuple[int], update_mode: str = 'split', rule: str = 'dftrc', capacity: int = 32, height_map: HeightMap = None):
+            self.size = tuple(size)
+            self.update_mode = update_mode
+            self.rule = rule
+            self.height_map = height_map
+            self.corner = np.array(size, dtype=np.int32)
+            self.EMS_block = np.zeros((capacity, 6), dtype=np.int32)
+            self.EMS_block[0, 3:] = size
+            self.item_block = np.zeros((capacity, 6), dtype=np.int32)
+            self.n_EMSs = 1
+            self.n_items = 0
+            self.load = 0
+            self.summarize()
+
+        @property
+        def EMSs(self) -> List[List[Tuple[int]]]:
+            return [[tuple(row[:3]), tuple(row[3:])] for row in self.EMS_block[:self.n_EMSs].tolist()]
+
+        @property
+        def items(self) -> List[List[Tuple[int]]]:
+            return [[tuple(row[:3]), tuple(row[3:])] for row in self.item_block[:self.n_items].tolist()]
+
+        # Keep the largest EMS extent along each axis and the remaining volume to skip bins that cannot hold an item
+        def summarize(self) -> None:
+            EMSs = self.EMS_block[:self.n_EMSs]
+            self.max_extents = tuple((EMSs[:, 3:] - EMSs[:, :3]).max(axis=0).tolist()) if self.n_EMSs else (0, 0, 0)
+            self.free_volume = self.size[0] * self.size[1] * self.size[2] - self.load
+
+        def can_fit(self, item: Tuple[int]) -> bool:
+            return item[0] * item[1] * item[2] <= self.free_volume and all(item[i] <= self.max_extents[i] for i in range(3))
+
+        def boxes(self) -> np.ndarray:
+            return self.item_block[:self.n_items]
+
+        def copy(self) -> 'Placement.ArrayBin':
+            bin = copy.copy(self)
+            bin.EMS_block = self.EMS_block[:max(self.n_EMSs, 1)].copy()
+            bin.item_block = self.item_block[:max(self.n_items, 1)].copy()
+            if self.height_map is not None:
+                bin.height_map = self.height_map.copy()
+            return bin
+
+        @staticmethod
+        def grow(block: np.ndarray, n_rows: int) -> np.ndarray:
+            if n_rows <= len(block): return block
+            new_block = np.zeros((max(n_rows, 2 * len(block)), 6), dtype=np.int32)
+            new_block[:len(block)] = block
+            return new_block
+
+        @staticmethod
+        def overlapped(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+            # overlapped[i, j]: boxes1[i] and boxes2[j] are overlapped (compared axis by axis to avoid 3D temporaries)
+            result = np.ones((len(boxes1), len(boxes2)), dtype=bool)
+            for axis in range(3):
+                result &= boxes1[:, None, axis] < boxes2[None, :, 3 + axis]
+                result &= boxes1[:, None, 3 + axis] > boxes2[None, :, axis]
+            return result
+
+        @staticmethod
+        def inscribed(EMSs1: np.ndarray, EMSs2: np.ndarray) -> np.ndarray:
+            # inscribed[i, j]: EMSs1[i] is inscribed in EMSs2[j]
+            result = np.ones((len(EMSs1), len(EMSs2)), dtype=bool)
+            for axis in range(3):
+                result &= EMSs1[:, None, axis] >= EMSs2[None, :, axis]
+                result &= EMSs1[:, None, 3 + axis] <= EMSs2[None, :, 3 + axis]
+            return result
+
+        # Return the index of the EMS chosen to place the item by the EMS rule (Distance to Front-Top-Right Corner by default)
+        def choose(self, item: Tuple[int]) -> Optional[int]:
+            EMSs = self.EMS_block[:self.n_EMSs]
+            corners = EMSs[:, :3] + np.asarray(item, dtype=np.int32)
+            candidates = np.flatnonzero((corners <= EMSs[:, 3:]).all(axis=1))
+            if candidates.size and self.n_items and self.update_mode != 'difference':
+                # Drop candidates whose placed item would overlap any placed item
+                spaces = np.concatenate((EMSs[candidates, :3], corners[candidates]), axis=1)
+                overlapped = self.overlapped(spaces, self.item_block[:self.n_items])
+                candidates = candidates[~overlapped.any(axis=1)]
+            if not candidates.size: return None
+            scores = EMS_RULES[self.rule](EMSs[candidates], np.asarray(item, dtype=np.int32), self.corner, self.item_block[:self.n_items])
+            return int(candidates[np.argmax(scores)]) # argmax keeps the first EMS among ties, as Bin does
+
+        def index(self, EMS: List[Tuple[int]]) -> int:
+            row = np.array(EMS[0] + EMS[1], dtype=np.int32)
+            return int(np.flatnonzero((self.EMS_block[:self.n_EMSs] == row).all(axis=1))[0])
+
+        # Vectorized difference process, keeping the same EMS order as Bin.difference
+        def difference(self, space: np.ndarray, min_size: int) -> None:
+            EMSs = self.EMS_block[:self.n_EMSs]
+            hit = self.overlapped(EMSs, space[None, :])[:, 0]
+            kept_EMSs = EMSs[~hit]
+
+            # Each intersected EMS gives 6 children: below and above the item along each axis
+            new_EMSs = np.repeat(EMSs[hit], 6, axis=0).reshape(-1, 6, 6)
+            for axis in range(3):
+                new_EMSs[:, 2 * axis, 3 + axis] = space[axis]
+                new_EMSs[:, 2 * axis + 1, axis] = space[3 + axis]
+            new_EMSs = new_EMSs.reshape(-1, 6)
+            new_EMSs = new_EMSs[np.min(new_EMSs[:, 3:] - new_EMSs[:, :3], axis=1) >= max(min_size, 1)]
+
+            # Only the kept EMSs that reach the bounding box of the children can contain one of them
+            if len(new_EMSs):
+                near = ((kept_EMSs[:, :3] <= new_EMSs[:, 3:].max(axis=0)) & (kept_EMSs[:, 3:] >= new_EMSs[:, :3].min(axis=0))).all(axis=1)
+                valid = ~self.inscribed(new_EMSs, kept_EMSs[near]).any(axis=1)
+            else:
+                valid = np.ones(0, dtype=bool)
+
+            # contained[i, j]: child i is inscribed in child j; among identical children only the first one is kept
+            contained = self.inscribed(new_EMSs, new_EMSs)
+            order = np.arange(len(new_EMSs))
+            dominated = contained & (~contained.T | (order[None, :] < order[:, None]))
+            np.fill_diagonal(dominated, False)
+            new_EMSs = new_EMSs[valid & ~dominated.any(axis=1)]
+
+            self.n_EMSs = len(kept_EMSs) + len(new_EMSs)
+            self.EMS_block = self.grow(self.EMS_block, self.n_EMSs)
+            self.EMS_block[:len(kept_EMSs)] = kept_EMSs
+            self.EMS_block[len(kept_EMSs):self.n_EMSs] = new_EMSs
+
+        # Update EMSs after placing the item into the chosen EMS (given by index or by value)
+        def update(self, item: Tuple[int], selected_EMS, min_size: int = 0) -> None:
+            index = selected_EMS if isinstance(selected_EMS, (int, np.integer)) else self.index(selected_EMS)
+            x1, y1, z1, x3, y3, z3 = self.EMS_block[index].tolist()
+            x2, y2, z2 = x1 + item[0], y1 + item[1], z1 + item[2]
+
+            self.item_block = self.grow(self.item_block, self.n_items + 1)
+            self.item_block[self.n_items] = (x1, y1, z1, x2, y2, z2)
+            self.n_items += 1
             self.load += item[0] * item[1] * item[2]
+            if self.height_map is not None:
+                self.height_map.update((x1, y1, z1, x2, y2, z2))
+
+            if self.update_mode == 'difference':
+                self.difference(self.item_block[self.n_items - 1], min_size)
+                self.summarize()
+                return
+
+            # Remove the selected EMS while keeping the order of the others
+            self.EMS_block[index:self.n_EMSs - 1] = self.EMS_block[index + 1:self.n_EMSs]
+            self.n_EMSs -= 1
+
+            new_EMSs = np.array([
+                [x2, y1, z1, x3, y3, z3],
+                [x1, y2, z1, x3, y3, z3],
+                [x1, y1, z2, x3, y3, z3]
+            ], dtype=np.int32)
+
+            # The new EMSs share their max corner and have distinct min corners, so none is inscribed in another
+            EMSs = self.EMS_block[:self.n_EMSs]
+            valid = (new_EMSs[:, :3] < new_EMSs[:, 3:]).all(axis=1)
+            new_EMSs = new_EMSs[valid & ~self.inscribed(new_EMSs, EMSs).any(axis=1)]
+
+            self.EMS_block = self.grow(self.EMS_block, self.n_EMSs + len(new_EMSs))
+            self.EMS_block[self.n_EMSs:self.n_EMSs + len(new_EMSs)] = new_EMSs
+            self.n_EMSs += len(new_EMSs)
+
+            self.summarize()
+
+    backends = {'list': Bin, 'array': ArrayBin}
+    update_modes = ('split', 'difference')
+
+    def __init__(self,
+                 problem: Problem,
+                 backend: str = 'list',
+                 update_mode: str = 'split',
+                 max_open_bins: int = None,
+                 EMS_rule: str = 'dftrc',
+                 bin_rule: str = 'first_fit'):
+        """
+        Parameters:
+        :param problem: Problem whose items are placed
+        :param backend: 'list' (Bin) or 'array' (ArrayBin)
+        :param update_mode: 'split' or 'difference' (see Bin)
+        :param max_open_bins: Only the last max_open_bins bins are searched for each item
+        :param EMS_rule: Name of the EMS selection rule (see rules.EMS_RULES)
+        :param bin_rule: Name of the bin selection rule (see rules.BIN_RULES)
+        """
+        if backend not in self.backends:
+            raise ValueError(f'Unknown backend: {backend}')
+        if update_mode not in self.update_modes:
+            raise ValueError(f'Unknown update mode: {update_mode}')
+        if EMS_rule not in EMS_RULES:
+            raise ValueError(f'Unknown EMS rule: {EMS_rule}')
+        if bin_rule not in BIN_RULES:
+            raise ValueError(f'Unknown bin rule: {bin_rule}')
+        if max_open_bins is not None and max_open_bins < 1:
+            raise ValueError('Number of open bins must be a positive integer')
 
-    def __init__(self, problem: Problem):
         self.problem = problem
         self.bin_size = problem.bin_size
         self.n_bins = problem.n_bins
         self.n_items = problem.n_items
         self.total_volume = problem.total_volume
-        self.items = problem.items
+        self.item_array = problem.item_array
+        self.items: List[Tuple[int]] = [] # Sizes of the items in placement order, set by decode
+        self.item_indices: np.ndarray = None # Index of the item at each position, set by decode
+        self.orientations: np.ndarray = None # Orientation of the item at each position, set by decode
+        self.placed: List[int] = [] # Bin index of each placed item
 
         self.used_bins = 1
         self.total_items = self.n_items * self.n_bins
-        self.bins = [self.Bin(self.bin_size)]
+        self.Bin = self.backends[backend]
+        self.update_mode = update_mode
+        self.EMS_rule = EMS_rule
+        self.bin_rule = BIN_RULES[bin_rule]
+        self.bins = [self.Bin(self.bin_size, update_mode, EMS_rule)]
         self.loads = None
+        self.pruned = False
+
+        # Only the last max_open_bins bins are searched for each item; older ones are closed
+        self.max_open_bins = max_open_bins
+        self.closed_EMSs = 0
+        self.skipped_bins = 0
+        self.skipped_EMSs = 0
+
+    # Axis permutation of each orientation (1 to 6), as in get_size
+    rotations = np.array([[0, 1, 2], [0, 2, 1], [1, 0, 2], [1, 2, 0], [2, 0, 1], [2, 1, 0]])
 
     @staticmethod
     def get_orientation(gene: float) -> int:
@@ -201,50 +600,141 @@ class Placement:
         elif orientation == 5: return (z, x, y)
         elif orientation == 6: return (z, y, x)
 
+    @staticmethod
+    def sequence(solution: List[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        - The decoded placement sequence of a solution: the position of each item and its orientation.
+        - Solutions with the same sequence always give the same packing.
+        """
+        solution = np.asarray(solution)
+        n = len(solution) // 2
+        return np.argsort(solution[:n]), np.ceil(6 * solution[n:]).astype(int)
+
+    @staticmethod
+    def encode(positions: np.ndarray, orientations: np.ndarray) -> np.ndarray:
+        """
+        - The solution of a placement sequence (the inverse of sequence): item i is placed at position positions[i]
+          in orientation orientations[i] (1 to 6).
+        - Order genes are spread evenly over (0, 1), and each orientation gene is the middle of its interval.
+        """
+        positions = np.asarray(positions)
+        n = len(positions)
+        keys = np.empty(n)
+        keys[positions] = (np.arange(n) + 0.5) / n
+        return np.concatenate((keys, (np.asarray(orientations) - 0.5) / 6))
+
     def decode(self, solution) -> None:
         if len(solution) != 2 * self.total_items:
             raise ValueError('Invalid solution length')
         
-        orders = np.argsort(solution[:self.total_items])
-
-        copy = self.items.copy()
-
-        for i in range(self.total_items):
-            item = copy[i]
-            orientation = self.get_orientation(solution[self.total_items + i])
-            size = self.get_size(item, orientation)
-            # print(f'Item: {item} | Orientation: {orientation} | Size: {size} | Order: {orders[i]}')
-            self.items[orders[i]] = size
-
-    def evaluate(self, solution: List[float]) -> float:
-        self.decode(solution)
+        orders, orientations = self.sequence(solution)
+        item_indices = np.empty_like(orders)
+        item_indices[orders] = np.arange(self.total_items)
+        self.arrange(item_indices, orientations)
+
+    def arrange(self, item_indices: np.ndarray, orientations: np.ndarray) -> None:
+        """
+        - Set the items to place: the item at each position, and the orientation of each item.
+        """
+        # Rotate every item at once (see get_size), in placement order
+        self.item_indices = item_indices
+        self.orientations = np.clip(orientations, 1, 6)[item_indices]
+        axes = self.rotations[self.orientations - 1]
+        items = np.take_along_axis(np.asarray(self.item_array)[item_indices], axes, axis=1)
+        self.items = list(map(tuple, items.tolist()))
+
+    def min_sizes(self) -> List[int]:
+        """
+        - For each position, the smallest dimension among the items placed after it (in any orientation).
+        - EMSs smaller than this on some axis can never be used again, so the difference process drops them.
+        """
+        min_sizes = [0] * self.total_items
+        min_size = np.inf
+        for i in range(self.total_items - 1, -1, -1):
+            min_sizes[i] = min_size
+            min_size = min(min_size, min(self.items[i]))
+        return min_sizes
+
+    def candidates(self, bins: List['Placement.Bin'], item: Tuple[int]) -> Iterator[Tuple['Placement.Bin', object]]:
+        """
+        - Yield each bin that can hold the item, in order, with the EMS chosen in it by the EMS rule.
+        """
+        for bin in bins:
+            # The summary of the bin rules it out before any EMS is checked
+            if not bin.can_fit(item):
+                self.skipped_bins += 1
+                self.skipped_EMSs += bin.n_EMSs
+                continue
+            EMS = bin.choose(item)
+            if EMS is not None:
+                yield bin, EMS
+
+    def pack(self, start: int = 0, interval: int = None, checkpoint: Callable[[int], None] = None, cutoff: float = None) -> None:
+        """
+        - Place the decoded items from position start on into the current bins.
+        - If a checkpoint callback is given, it is called with the number of placed items every interval items.
+        - If a cutoff is given, packing is abandoned (and marked as pruned) as soon as the fitness cannot be lower than it.
+        """
+        min_sizes = self.min_sizes() if self.update_mode == 'difference' else [0] * self.total_items
+        if cutoff is not None:
+            bin_volume = self.bin_size[0] * self.bin_size[1] * self.bin_size[2]
+            volumes = [x * y * z for x, y, z in self.items]
+            remaining_volume = sum(volumes[start:])
         
-        for item in self.items:
+        for i in range(start, self.total_items):
+            item = self.items[i]
             selected_bin = None
             selected_EMS = None
 
-            for bin in self.bins:
-                # print(f'Bin index: {self.bins.index(bin)}')
-                EMS = bin.choose(item)
-                # print(f'Item: {item} | Selected EMS: {EMS}')
-                if EMS is not None:
-                    selected_bin = bin
-                    selected_EMS = EMS
-                    break
+            bins = self.bins
+            if self.max_open_bins is not None and len(bins) > self.max_open_bins:
+                bins = bins[-self.max_open_bins:]
+                self.skipped_bins += len(self.bins) - self.max_open_bins
+                self.skipped_EMSs += self.closed_EMSs
+
+            # The bin rule draws (bin, EMS) candidates lazily, so first-fit stops at the first bin that can hold the item
+            selected = self.bin_rule(self.candidates(bins, item))
+            if selected is not None:
+                selected_bin, selected_EMS = selected
 
             if selected_bin is None:
                 self.used_bins += 1
-                self.bins.append(self.Bin(self.bin_size))
+                if cutoff is not None:
+                    # The remaining items need at least this many bins, and the least load adds a positive amount
+                    free_volume = sum(bin_volume - bin.load for bin in self.bins) + bin_volume
+                    needed_bins = self.used_bins + -(-max(0, remaining_volume - free_volume) // bin_volume)
+                    if needed_bins >= cutoff:
+                        self.pruned = True
+                        return
+                self.bins.append(self.Bin(self.bin_size, self.update_mode, self.EMS_rule))
+                if self.max_open_bins is not None and len(self.bins) > self.max_open_bins:
+                    self.closed_EMSs += self.bins[-self.max_open_bins - 1].n_EMSs
                 selected_bin = self.bins[-1]
                 selected_EMS = selected_bin.EMSs[0]
+                self.placed.append(len(self.bins) - 1)
+            else:
+                self.placed.append(self.bins.index(selected_bin, len(self.bins) - len(bins)))
 
             # print(f'Item: {item} | Selected EMS: {selected_EMS} | Bin index: {self.bins.index(selected_bin)}')
-            selected_bin.update(item, selected_EMS)
+            selected_bin.update(item, selected_EMS, min_sizes[i])
+            if cutoff is not None:
+                remaining_volume -= volumes[i]
             if 11 < 3:
                 print(f'Updated load: {selected_bin.load}')
                 print(f'Updated EMSs: {selected_bin.EMSs}')
                 print(f'Item: {item} | EMSs: {selected_bin.EMSs} | Bin index: {self.bins.index(selected_bin)}')
-
+            if checkpoint is not None and (i + 1) % interval == 0 and i + 1 < self.total_items:
+                checkpoint(i + 1)
+
+        counters = self.problem.counters
+        if counters is not None:
+            counters['decodes'] += 1
+            counters['EMSs'] += sum(bin.n_EMSs for bin in self.bins)
+
+    def fitness(self) -> float:
+        """
+        - Compute the fitness of the packed bins and record the solution if it is the best one so far.
+        """
         self.loads = [bin.load for bin in self.bins]
         least_load = np.min(self.loads) / (self.bin_size[0] * self.bin_size[1] * self.bin_size[2])
         fitness = self.used_bins + least_load
@@ -253,9 +743,28 @@ class Placement:
             self.problem.used_bins = self.used_bins
             self.problem.best_fitness = fitness
             self.problem.loads = self.loads
-            self.problem.solution = [bin.items for bin in self.bins]
+            self.problem.solution = self.solution()
 
         return fitness # To maximize the fitness
+
+    def solution(self) -> np.ndarray:
+        """
+        - The packed bins as a structured array (see solutions.py), sorted by bin, then by placement order.
+        """
+        positions = np.argsort(np.asarray(self.placed), kind='stable')
+        bins = np.asarray(self.placed)[positions]
+        return solutions.build(np.concatenate([bin.boxes() for bin in self.bins]), bins,
+                               self.item_indices[positions], self.orientations[positions])
+
+    def evaluate(self, solution: List[float], cutoff: float = None) -> float:
+        """
+        - Return the fitness of the solution, or infinity if packing was abandoned because it could not beat the cutoff.
+        """
+        self.decode(solution)
+        self.pack(cutoff=cutoff)
+        if self.pruned:
+            return np.inf
+        return self.fitness()
     
 if 11 < 3:
     problem = Problem('Data/Dataset/test.dat')
@@ -0,0 +1,151 @@
+import os
+import numpy as np
+from typing import List, Tuple
+
+"""
+Rendering of packings, batched for large solutions and usable on headless machines.
+- Boxes are rows (x1, y1, z1, x2, y2, z2) of one array. The faces of all boxes are built as one (6 * n, 4, 3) vertex array
+  and drawn as a single Poly3DCollection.
+- With a path, the figure is drawn on an Agg canvas and saved (PNG, SVG, PDF, ... from the extension) without opening a window.
+  Without a path, it is shown with pyplot.
+- Very large solutions can be decimated (only the largest boxes are drawn) or paged (a few bins per image).
+- export_obj writes the boxes as a Wavefront OBJ mesh, which any 3D viewer can open.
+- matplotlib is only imported when something is rendered. pyplot is only imported to show a figure.
+"""
+
+# Vertex indices of the 6 faces of a box, with the 8 vertices numbered as bits (x, y, z) of the index
+FACES = np.array([[0, 1, 5, 4], [2, 3, 7, 6], [0, 2, 6, 4], [1, 3, 7, 5], [0, 1, 3, 2], [4, 5, 7, 6]])
+CORNERS = np.array([[(i >> axis) & 1 for axis in range(3)] for i in range(8)])
+
+def vertices(boxes: np.ndarray) -> np.ndarray:
+    """
+    - The 8 vertices of each box, as an (n, 8, 3) array.
+    """
+    boxes = np.asarray(boxes, dtype=float).reshape(-1, 6)
+    return np.where(CORNERS[None, :, :] == 1, boxes[:, None, 3:], boxes[:, None, :3])
+
+def faces(boxes: np.ndarray) -> np.ndarray:
+    """
+    - The 6 quadrilateral faces of each box, as a (6 * n, 4, 3) array (the faces of box i are rows 6 * i to 6 * i + 5).
+    """
+    return vertices(boxes)[:, FACES].reshape(-1, 4, 3)
+
+def decimate(boxes: np.ndarray, max_boxes: int) -> np.ndarray:
+    """
+    - Indices of the max_boxes largest boxes (by volume), in their original order.
+    """
+    if max_boxes is None or len(boxes) <= max_boxes:
+        return np.arange(len(boxes))
+    volumes = np.prod(boxes[:, 3:] - boxes[:, :3], axis=1)
+    return np.sort(np.argsort(-volumes, kind='stable')[:max_boxes])
+
+# seaborn's 'pastel' palette, which matplotlib does not have
+PASTEL = ['#a1c9f4', '#ffb482', '#8de5a1', '#ff9f9b', '#d0bbff', '#debb9b', '#fab0e4', '#cfcfcf', '#fffea3', '#b9f2f0']
+
+def palette(name: str, n: int) -> np.ndarray:
+    """
+    - RGB color of each of n boxes, cycling through a qualitative palette.
+    - 'pastel' and the matplotlib colormaps do not import seaborn (which imports pyplot); other names are seaborn palettes.
+    """
+    from matplotlib import colormaps
+    from matplotlib.colors import to_rgb
+
+    if name == 'pastel':
+        colors = np.array([to_rgb(color) for color in PASTEL])
+    elif name in colormaps:
+        colormap = colormaps[name]
+        colors = np.array(colormap.colors)[:, :3] if hasattr(colormap, 'colors') else colormap(np.linspace(0, 1, max(n, 1)))[:, :3]
+    else:
+        import seaborn as sns
+        colors = np.array(sns.color_palette(name))
+    return colors[np.arange(n) % len(colors)]
+
+def render(boxes: np.ndarray,
+           bin_size: Tuple[int],
+           n_bins: int,
+           path: str = None,
+           title: str = '3D Bin Packing Visualization',
+           info_text: str = None,
+           palette_name: str = 'Set3',
+           alpha: float = 0.2,
+           linewidth: float = 0.5,
+           max_boxes: int = None,
+           figsize: Tuple[float] = (9, 5),
+           dpi: int = 100) -> None:
+    """
+    Draw boxes laid out along the x axis in n_bins bins.
+
+    Parameters:
+    :param boxes: Array of rows (x1, y1, z1, x2, y2, z2), already offset by the position of their bin
+    :param bin_size: Size of the bins
+    :param n_bins: Number of bins shown (sets the x limit)
+    :param path: File to save the figure to (format from its extension); the figure is shown if None
+    :param max_boxes: Only draw the largest boxes if there are more
+    """
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+    boxes = np.asarray(boxes, dtype=float).reshape(-1, 6)
+    n_boxes = len(boxes)
+    colors = palette(palette_name, n_boxes)
+    kept = decimate(boxes, max_boxes)
+    boxes, colors = boxes[kept], colors[kept]
+
+    if path is None:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=figsize)
+    else:
+        # A figure on its own Agg canvas does not depend on pyplot or on a display
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111, projection='3d')
+
+    collection = Poly3DCollection(faces(boxes), facecolors=np.repeat(colors, 6, axis=0), linewidths=linewidth,
+                                  edgecolors='k', alpha=alpha, zsort='average')
+    ax.add_collection3d(collection)
+
+    ax.set_xlabel('X')
+    ax.set_ylabel('Y')
+    ax.set_zlabel('Z')
+    ax.set_xlim([0, bin_size[0] * n_bins])
+    ax.set_ylim([0, bin_size[1]])
+    ax.set_zlim([0, bin_size[2]])
+    ax.title.set_text(title)
+    ax.set_box_aspect([bin_size[0] * n_bins, bin_size[1], bin_size[2]])
+
+    if info_text:
+        if len(boxes) < n_boxes:
+            info_text += f'\nItems drawn: {len(boxes)} of {n_boxes}'
+        fig.text(0.75, 0.5, info_text, fontsize=8, ha='left', va='center', bbox=dict(facecolor='white', edgecolor='black'))
+
+    if path is None:
+        import matplotlib.pyplot as plt
+        plt.show()
+    else:
+        fig.savefig(path)
+
+def page_path(path: str, page: int) -> str:
+    # File of one page of a paged rendering: name_0.png, name_1.png, ...
+    root, extension = os.path.splitext(path)
+    return f'{root}_{page}{extension}'
+
+def export_obj(boxes: np.ndarray, path: str, groups: List[int] = None) -> None:
+    """
+    Write the boxes as a Wavefront OBJ mesh: 8 vertices and 6 quadrilateral faces per box, one object per box.
+
+    Parameters:
+    :param boxes: Array of rows (x1, y1, z1, x2, y2, z2)
+    :param groups: Optional group (e.g. bin index) of each box, written as OBJ groups
+    """
+    boxes = np.asarray(boxes, dtype=float).reshape(-1, 6)
+    points = vertices(boxes)
+    indices = FACES[None, :, :] + 1 + 8 * np.arange(len(boxes))[:, None, None] # OBJ vertex indices start at 1
+    with open(path, 'w') as file:
+        file.write(f'# {len(boxes)} boxes\n')
+        for i in range(len(boxes)):
+            if groups is not None and (i == 0 or groups[i] != groups[i - 1]):
+                file.write(f'g bin_{groups[i]}\n')
+            file.write(f'o item_{i}\n')
+            file.write(''.join(f'v {x:g} {y:g} {z:g}\n' for x, y, z in points[i].tolist()))
+            file.write(''.join(f'f {a} {b} {c} {d}\n' for a, b, c, d in indices[i].tolist()))
@@ -0,0 +1,87 @@
+import numpy as np
+from typing import Dict, Callable, Iterator, Tuple, Optional
+
+"""
+Placement rules, selected by name in Placement.
+- EMS rules score every candidate EMS of a bin for an item in one vectorized pass. The candidate with the highest score is
+  chosen, and the first one among ties.
+- Bin rules choose the bin among the bins that can hold the item, given lazily in the order they were opened.
+New rules are added to the registries with the register_EMS_rule and register_bin_rule decorators.
+
+EMS rules receive:
+- EMSs: (n, 6) array of the candidate EMSs (x1, y1, z1, x2, y2, z2), all of which can hold the item
+- item: (3,) array of the size of the item
+- bin_size: (3,) array of the size of the bin
+- items: (m, 6) array of the items already placed in the bin
+"""
+
+EMSRule = Callable[[np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray]
+BinRule = Callable[[Iterator[Tuple[object, object]]], Optional[Tuple[object, object]]]
+
+EMS_RULES: Dict[str, EMSRule] = {}
+BIN_RULES: Dict[str, BinRule] = {}
+
+def register_EMS_rule(name: str) -> Callable[[EMSRule], EMSRule]:
+    def register(rule: EMSRule) -> EMSRule:
+        EMS_RULES[name] = rule
+        return rule
+    return register
+
+def register_bin_rule(name: str) -> Callable[[BinRule], BinRule]:
+    def register(rule: BinRule) -> BinRule:
+        BIN_RULES[name] = rule
+        return rule
+    return register
+
+@register_EMS_rule('dftrc')
+def distance_to_front_top_right_corner(EMSs: np.ndarray, item: np.ndarray, bin_size: np.ndarray, items: np.ndarray) -> np.ndarray:
+    # Squared distance from the far corner of the placed item to the front-top-right corner of the bin (maximized)
+    corners = EMSs[:, :3] + item
+    return np.sum((bin_size - corners).astype(np.int64) ** 2, axis=1)
+
+@register_EMS_rule('bbl')
+def back_bottom_left(EMSs: np.ndarray, item: np.ndarray, bin_size: np.ndarray, items: np.ndarray) -> np.ndarray:
+    # Lowest z first, then lowest x, then lowest y of the min corner, encoded as one integer key (minimized)
+    x, y, z = (EMSs[:, axis].astype(np.int64) for axis in range(3))
+    X, Y = int(bin_size[0]) + 1, int(bin_size[1]) + 1
+    return -((z * X + x) * Y + y)
+
+@register_EMS_rule('best_volume')
+def best_volume_fit(EMSs: np.ndarray, item: np.ndarray, bin_size: np.ndarray, items: np.ndarray) -> np.ndarray:
+    # Smallest EMS that can hold the item, leaving the larger ones for larger items
+    return -np.prod((EMSs[:, 3:] - EMSs[:, :3]).astype(np.int64), axis=1)
+
+@register_EMS_rule('contact_area')
+def contact_area(EMSs: np.ndarray, item: np.ndarray, bin_size: np.ndarray, items: np.ndarray) -> np.ndarray:
+    # Area of the faces of the placed item touching the walls of the bin or the items already placed (maximized)
+    low = EMSs[:, :3].astype(np.int64)
+    high = low + item
+    item = np.asarray(item, dtype=np.int64)
+    areas = np.zeros(len(EMSs), dtype=np.int64)
+    for axis in range(3):
+        other = [a for a in range(3) if a != axis]
+        face = item[other[0]] * item[other[1]]
+        areas += face * ((low[:, axis] == 0).astype(np.int64) + (high[:, axis] == bin_size[axis]))
+        if not len(items):
+            continue
+        # Overlap of the faces on the two other axes, for every (candidate, placed item) pair
+        overlap = np.ones((len(EMSs), len(items)), dtype=np.int64)
+        for a in other:
+            overlap *= np.maximum(0, np.minimum(high[:, None, a], items[None, :, 3 + a]) - np.maximum(low[:, None, a], items[None, :, a]))
+        touching = (low[:, None, axis] == items[None, :, 3 + axis]) | (high[:, None, axis] == items[None, :, axis])
+        areas += np.sum(overlap * touching, axis=1)
+    return areas
+
+@register_bin_rule('first_fit')
+def first_fit(candidates: Iterator[Tuple[object, object]]) -> Optional[Tuple[object, object]]:
+    # The first (oldest) bin that can hold the item; later bins are not searched
+    return next(candidates, None)
+
+@register_bin_rule('best_fit')
+def best_fit(candidates: Iterator[Tuple[object, object]]) -> Optional[Tuple[object, object]]:
+    # The bin with the largest load that can hold the item (the first one among ties)
+    selected = None
+    for bin, EMS in candidates:
+        if selected is None or bin.load > selected[0].load:
+            selected = (bin, EMS)
+    return selected
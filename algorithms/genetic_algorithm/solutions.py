@@ -0,0 +1,183 @@
+import numpy as np
+from typing import List, Tuple
+
+"""
+A packing solution is one structured array with a record per placed item (SOLUTION):
+- item: index of the item in the instance, bin: index of its bin.
+- x, y, z: corner of the item closest to the origin of its bin, dx, dy, dz: its size as placed.
+- orientation: the orientation (1 to 6, see Placement.get_size) giving the placed size from the size in the instance.
+Records are sorted by bin, then by placement order within a bin.
+Solutions are stored either as CSV (a header line, then one line per item) or in a binary format like instances:
+- A fixed header (HEADER): magic bytes, format version, bin size, number of bins, number of placed items.
+- Followed by the records, little-endian and packed, so a file is read back with np.memmap without a copy.
+"""
+
+MAGIC = b'BPPS'
+VERSION = 1
+HEADER = np.dtype([
+    ('magic', 'S4'),
+    ('version', '<i4'),
+    ('bin_size', '<i4', (3,)),
+    ('n_bins', '<i4'),
+    ('n_items', '<i4')
+])
+SOLUTION = np.dtype([
+    ('item', '<i4'),
+    ('bin', '<i4'),
+    ('x', '<i4'),
+    ('y', '<i4'),
+    ('z', '<i4'),
+    ('dx', '<i4'),
+    ('dy', '<i4'),
+    ('dz', '<i4'),
+    ('orientation', 'i1')
+])
+FIELDS = SOLUTION.names
+
+# Axis permutation of each orientation (1 to 6), as Placement.rotations
+ROTATIONS = np.array([[0, 1, 2], [0, 2, 1], [1, 0, 2], [1, 2, 0], [2, 0, 1], [2, 1, 0]])
+
+def build(boxes: np.ndarray, bins: np.ndarray, items: np.ndarray, orientations: np.ndarray) -> np.ndarray:
+    """
+    - The solution of placed boxes (n, 6) as rows (x1, y1, z1, x2, y2, z2), with the bin, item index and orientation of each.
+    """
+    boxes = np.asarray(boxes).reshape(-1, 6)
+    solution = np.empty(len(boxes), dtype=SOLUTION)
+    solution['item'] = items
+    solution['bin'] = bins
+    for i, axis in enumerate('xyz'):
+        solution[axis] = boxes[:, i]
+        solution[f'd{axis}'] = boxes[:, i + 3] - boxes[:, i]
+    solution['orientation'] = orientations
+    return solution
+
+def boxes(solution: np.ndarray) -> np.ndarray:
+    """
+    - The placed items as int64 rows (x1, y1, z1, x2, y2, z2), in their bins.
+    """
+    corners = np.stack([solution['x'], solution['y'], solution['z']], axis=1).astype(np.int64)
+    return np.concatenate((corners, corners + np.stack([solution['dx'], solution['dy'], solution['dz']], axis=1)), axis=1)
+
+def save_binary(solution: np.ndarray, path: str, bin_size: Tuple[int]) -> None:
+    header = np.zeros(1, dtype=HEADER)
+    header['magic'] = MAGIC
+    header['version'] = VERSION
+    header['bin_size'] = bin_size
+    header['n_bins'] = int(solution['bin'].max()) + 1 if len(solution) else 0
+    header['n_items'] = len(solution)
+    with open(path, 'wb') as file:
+        file.write(header.tobytes())
+        file.write(np.ascontiguousarray(solution, dtype=SOLUTION).tobytes())
+
+def load_binary(path: str) -> Tuple[np.ndarray, Tuple[int]]:
+    """
+    - Return the solution (memory-mapped, read-only) and the bin size of a binary solution file.
+    """
+    header = np.fromfile(path, dtype=HEADER, count=1)[0]
+    if header['magic'] != MAGIC:
+        raise ValueError(f'Not a solution file: {path}')
+    if header['version'] != VERSION:
+        raise ValueError(f'Unsupported solution format version: {header["version"]}')
+    solution = np.memmap(path, dtype=SOLUTION, mode='r', offset=HEADER.itemsize, shape=(int(header['n_items']),))
+    return solution, tuple(map(int, header['bin_size']))
+
+def save_csv(solution: np.ndarray, path: str) -> None:
+    # One join over plain integers is much faster than np.savetxt, which formats every row separately
+    columns = np.stack([solution[field].astype(np.int64) for field in FIELDS], axis=1)
+    lines = map(','.join, np.char.mod('%d', columns).tolist())
+    with open(path, 'w') as file:
+        file.write(','.join(FIELDS) + '\n')
+        file.writelines(line + '\n' for line in lines)
+
+def load_csv(path: str) -> np.ndarray:
+    with open(path) as file:
+        header = file.readline().strip().split(',')
+    if tuple(header) != FIELDS:
+        raise ValueError(f'Unexpected CSV columns: {header}')
+    columns = np.loadtxt(path, dtype=np.int64, delimiter=',', skiprows=1, ndmin=2)
+    solution = np.empty(len(columns), dtype=SOLUTION)
+    for i, field in enumerate(FIELDS):
+        solution[field] = columns[:, i]
+    return solution
+
+def overlaps(boxes: np.ndarray, bins: np.ndarray, max_pairs: int = 1 << 22) -> np.ndarray:
+    """
+    - The pairs (i, j) of boxes (n, 6) of the same bin whose interiors intersect, as an (m, 2) array.
+    - Sweep along x: boxes are sorted by bin and x1, and each box is only compared with the boxes of its bin that start
+      within its x extent (found with one searchsorted), so far fewer than n^2 pairs are checked.
+    - Candidate pairs are generated in chunks of at most max_pairs to bound memory.
+    """
+    boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 6)
+    bins = np.asarray(bins, dtype=np.int64)
+    span = int(max(boxes[:, 3].max(), 0)) + 1 if len(boxes) else 1
+    keys = bins * span + boxes[:, 0]
+    order = np.argsort(keys, kind='stable')
+    keys, boxes, bins = keys[order], boxes[order], bins[order]
+    ends = np.searchsorted(keys, bins * span + boxes[:, 3], side='left')
+    counts = np.maximum(ends - np.arange(len(boxes)) - 1, 0)
+
+    pairs = []
+    first = 0
+    while first < len(boxes):
+        # Grow the chunk of first boxes until it holds max_pairs candidate pairs (at least one box)
+        last = first + max(1, int(np.searchsorted(np.cumsum(counts[first:]), max_pairs, side='right')))
+        chunk_counts = counts[first:last]
+        i = np.repeat(np.arange(first, last), chunk_counts)
+        j = i + 1 + np.arange(len(i)) - np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+        # The second box starts within the x extent of the first, so they intersect along x unless it is flat,
+        # and only need to intersect along y and z. Bins are compared too, since a box with a negative x (outside its bin)
+        # has a key within the previous bin.
+        hit = ((bins[i] == bins[j]) & (boxes[j, 0] < boxes[j, 3]) &
+               (np.maximum(boxes[i, 1:3], boxes[j, 1:3]) < np.minimum(boxes[i, 4:6], boxes[j, 4:6])).all(axis=1))
+        pairs.append(np.stack([order[i[hit]], order[j[hit]]], axis=1))
+        first = last
+    return np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.int64)
+
+def validate(solution: np.ndarray, bin_size: Tuple[int], item_array: np.ndarray = None) -> List[str]:
+    """
+    - Return the violations of a solution (an empty list if it is valid), each as a message:
+      items with a non-positive size, items not contained in their bin, overlapping items of the same bin and, given the
+      items of the instance, items missing or placed twice and placed sizes that do not match the orientation.
+    - Every check is vectorized, so solutions of thousands of items are validated without a Python loop over pairs.
+    """
+    violations = []
+    placed = boxes(solution)
+    sizes = placed[:, 3:] - placed[:, :3]
+
+    empty = np.flatnonzero((sizes <= 0).any(axis=1))
+    if len(empty):
+        violations.append(f'{len(empty)} item(s) with a non-positive size, e.g. item {int(solution["item"][empty[0]])}')
+    outside = np.flatnonzero((placed[:, :3] < 0).any(axis=1) | (placed[:, 3:] > np.asarray(bin_size)).any(axis=1))
+    if len(outside):
+        violations.append(f'{len(outside)} item(s) not contained in their bin, e.g. item {int(solution["item"][outside[0]])}')
+    pairs = overlaps(placed, solution['bin'])
+    if len(pairs):
+        i, j = solution['item'][pairs[0]]
+        violations.append(f'{len(pairs)} pair(s) of overlapping items, e.g. items {int(i)} and {int(j)} in bin {int(solution["bin"][pairs[0, 0]])}')
+
+    if item_array is not None:
+        item_array = np.asarray(item_array)
+        item_indices = solution['item'].astype(np.int64)
+        if ((item_indices < 0) | (item_indices >= len(item_array))).any():
+            violations.append('Item indices out of range of the instance')
+        else:
+            counts = np.bincount(item_indices, minlength=len(item_array))
+            if (counts == 0).any():
+                violations.append(f'{int((counts == 0).sum())} item(s) not placed')
+            if (counts > 1).any():
+                violations.append(f'{int((counts > 1).sum())} item(s) placed more than once')
+            orientations = solution['orientation'].astype(np.int64)
+            if ((orientations < 1) | (orientations > 6)).any():
+                violations.append('Orientations out of range 1 to 6')
+            else:
+                expected = np.take_along_axis(item_array[solution['item']], ROTATIONS[orientations - 1], axis=1)
+                mismatched = np.flatnonzero((expected != sizes).any(axis=1))
+                if len(mismatched):
+                    violations.append(f'{len(mismatched)} item(s) whose size does not match their orientation, e.g. item {int(solution["item"][mismatched[0]])}')
+    return violations
+
+if 11 < 3:
+    solution = build([[0, 0, 0, 50, 50, 50], [40, 0, 0, 90, 50, 50]], [0, 0], [0, 1], [1, 1])
+    print(validate(solution, (100, 100, 100)))
+    save_csv(solution, 'solution.csv')
+    print(load_csv('solution.csv'))
@@ -0,0 +1,142 @@
+import os
+import time
+import argparse
+import numpy as np
+from typing import List, Tuple, Dict, Callable
+from problem import Problem, Placement
+
+"""
+SweepBox: a fast deterministic constructive heuristic for the 3D bin packing problem.
+- Each item is turned into a single orientation by an orientation policy:
+  'flat' (shortest side vertical, longest side along x), 'tall' (longest side vertical) or 'given' (as in the instance).
+  Orientations that do not fit in the bin are never chosen.
+- The items are then swept in the order of a sort key. For example, 'layer' takes the tallest items first and, among items of
+  the same height, the largest base first, so items of one height are placed side by side and build layers.
+- The sequence is placed by the EMS / DFTRC engine of Placement, so a sweep costs a single decode and its solution is recorded
+  in the Problem like any other. With the array backend and the difference process, a sweep of 1000 items takes about 0.4 to 0.5 s
+  on data/dataset instances and 0.7 to 0.8 s on generated ones, whose bins hold more items and so more EMSs.
+- Each sweep is also written as a random-key chromosome (Placement.encode) which decodes to exactly the same packing.
+  These chromosomes warm-start the genetic algorithm through Configuration.initial_chromosomes and seed_fraction.
+"""
+
+# Sort keys of the sweeps: functions of the oriented sizes (n, 3) returning keys by decreasing priority, all in decreasing order
+SORT_KEYS: Dict[str, Callable[[np.ndarray], Tuple[np.ndarray]]] = {
+    'layer': lambda sizes: (sizes[:, 2], sizes[:, 0] * sizes[:, 1]),
+    'volume': lambda sizes: (sizes.prod(axis=1), sizes[:, 2]),
+    'area': lambda sizes: (sizes[:, 0] * sizes[:, 1], sizes[:, 2]),
+    'longest': lambda sizes: (sizes.max(axis=1), sizes.prod(axis=1))
+}
+
+ORIENTATION_POLICIES = ('flat', 'tall', 'given')
+
+class SweepBox:
+    def __init__(self, problem: Problem, **placement):
+        """
+        Parameters:
+        :param problem: Problem whose items are packed
+        :param placement: Keyword arguments of Placement (array backend and difference update mode by default)
+        """
+        self.problem = problem
+        self.placement = {'backend': 'array', 'update_mode': 'difference', **placement}
+
+        # Size of every item in each of the 6 orientations (n, 6, 3), as in Placement.get_size
+        items = np.asarray(problem.item_array, dtype=np.int64)
+        self.sizes = items[:, Placement.rotations]
+        self.fits = np.all(self.sizes <= np.array(problem.bin_size), axis=2)
+
+    @staticmethod
+    def sweeps() -> List[Tuple[str, str]]:
+        """
+        - All (orientation policy, sort key) pairs.
+        """
+        return [(orientation, key) for orientation in ORIENTATION_POLICIES for key in SORT_KEYS]
+
+    def orient(self, policy: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        - Return the orientation (1 to 6) and the oriented size of each item under the given policy.
+        """
+        if policy not in ORIENTATION_POLICIES:
+            raise ValueError(f'Unknown orientation policy: {policy}')
+        x, y, z = self.sizes[:, :, 0], self.sizes[:, :, 1], self.sizes[:, :, 2]
+        scale = int(self.sizes.max()) + 1
+        if policy == 'flat':
+            scores = (-z * scale + x) * scale + y
+        elif policy == 'tall':
+            scores = (z * scale + x) * scale + y
+        else:
+            scores = np.zeros(x.shape, dtype=np.int64)
+            scores[:, 0] = 1
+        # Orientations that do not fit score lowest; an item that fits in none keeps the preferred one
+        scores = np.where(self.fits, scores, scores - 2 * scale ** 3)
+        orientations = np.argmax(scores, axis=1)
+        return orientations + 1, self.sizes[np.arange(len(orientations)), orientations]
+
+    def sequence(self, orientation: str = 'flat', key: str = 'layer') -> Tuple[np.ndarray, np.ndarray]:
+        """
+        - Return the position of each item in the sweep and its orientation. Ties are broken by the index of the item.
+        """
+        if key not in SORT_KEYS:
+            raise ValueError(f'Unknown sort key: {key}')
+        orientations, sizes = self.orient(orientation)
+        order = np.lexsort([-k for k in reversed(SORT_KEYS[key](sizes))])
+        positions = np.empty(len(order), dtype=int)
+        positions[order] = np.arange(len(order))
+        return positions, orientations
+
+    def chromosome(self, orientation: str = 'flat', key: str = 'layer') -> np.ndarray:
+        """
+        - The random-key chromosome of a sweep: it decodes to the same placement sequence, hence to the same packing.
+        """
+        return Placement.encode(*self.sequence(orientation, key))
+
+    def chromosomes(self, sweeps: List[Tuple[str, str]] = None) -> np.ndarray:
+        """
+        - The chromosomes of the given sweeps (all of them by default), without duplicate sequences, in the order of the sweeps.
+        """
+        chromosomes = np.array([self.chromosome(orientation, key) for orientation, key in (sweeps or self.sweeps())])
+        _, first = np.unique(chromosomes, axis=0, return_index=True)
+        return chromosomes[np.sort(first)]
+
+    def evaluate(self, orientation: str = 'flat', key: str = 'layer') -> Tuple[float, Placement]:
+        """
+        - Pack the items with one sweep and return its fitness (as in the genetic algorithm) and its placement.
+        """
+        placement = Placement(self.problem, **self.placement)
+        fitness = placement.evaluate(self.chromosome(orientation, key))
+        return fitness, placement
+
+    def solve(self, sweeps: List[Tuple[str, str]] = (('flat', 'layer'),)) -> dict:
+        """
+        - Run the given sweeps and keep the best packing, which is also recorded in the Problem if it beats its best solution.
+        - Return a summary of the best sweep's own packing, as optimizer.solve does.
+        """
+        start = time.perf_counter()
+        best_fitness, best_sweep, best_placement = np.inf, None, None
+        for orientation, key in sweeps:
+            fitness, placement = self.evaluate(orientation, key)
+            if fitness < best_fitness:
+                best_fitness, best_sweep, best_placement = fitness, (orientation, key), placement
+        return {
+            'path': self.problem.path,
+            'sweep': best_sweep,
+            'best_fitness': best_fitness,
+            'used_bins': best_placement.used_bins,
+            'lower_bound': self.problem.lower_bound,
+            'loads': best_placement.loads,
+            'solution': best_placement.solution(),
+            'time': time.perf_counter() - start
+        }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pack instances with the SweepBox constructive heuristic')
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--all', action='store_true', help='Run every sweep and keep the best')
+    parser.add_argument('--backend', default='array', choices=list(Placement.backends))
+    parser.add_argument('--update-mode', default='difference', choices=list(Placement.update_modes))
+    args = parser.parse_args()
+
+    for path in args.paths:
+        sweepbox = SweepBox(Problem(path), backend=args.backend, update_mode=args.update_mode)
+        result = sweepbox.solve(SweepBox.sweeps()) if args.all else sweepbox.solve()
+        print(f'{os.path.basename(path)} | {result["used_bins"]} bins (lower bound {result["lower_bound"]}) | '
+              f'fitness {result["best_fitness"]:.4f} | sweep {"/".join(result["sweep"])} | {result["time"]:.3f} s')
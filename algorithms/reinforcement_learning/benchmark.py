@@ -0,0 +1,161 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+
+from typing import List, Tuple
+
+# The environment and the model import from the genetic algorithm (heightmap.py, problem.py) and from data (generator.py).
+# The directories are appended, so the modules of this directory (benchmark.py) come first
+GENETIC_ALGORITHM = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'genetic_algorithm')
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data')
+sys.path += [GENETIC_ALGORITHM, DATA]
+from environment import PackingEnv
+
+"""
+Benchmarks for the reinforcement learning components. Run from this directory:
+- python benchmark.py env: environment steps per second of PackingEnv against the batch size, and of a Python loop over
+  single Placement bins placing the same items.
+- python benchmark.py inference: import time of model.py, and latency per decision of the CNN scorer (eager, int8 quantized
+  and TorchScript) when scoring 1, 32 and 256 candidate placements at once.
+"""
+
+def random_actions(env: PackingEnv, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    - Draw one valid (item, orientation) action per episode uniformly at random.
+    """
+    mask = env.action_mask().reshape(env.batch_size, -1)
+    actions = np.argmax(np.where(mask, rng.random(mask.shape), -1), axis=1)
+    return actions // 6, actions % 6 + 1
+
+def time_env(batch_size: int, n_items: int, n_episodes: int, seed: int = 0) -> Tuple[float, List[Tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+    """
+    Run random episodes in batches and return the environment steps per second (one step of one episode counts as one),
+    with the items and actions of the first batch.
+    """
+    rng = np.random.default_rng(seed)
+    env = PackingEnv(batch_size, n_items, seed=seed)
+    elapsed, n_steps, episodes = 0.0, 0, None
+    for _ in range(max(1, n_episodes // batch_size)):
+        env.reset()
+        actions = []
+        for _ in range(env.total_items):
+            items, orientations = random_actions(env, rng)
+            start = time.perf_counter()
+            env.step(items, orientations)
+            elapsed += time.perf_counter() - start
+            actions.append((items, orientations))
+        n_steps += batch_size * env.total_items
+        if episodes is None:
+            episodes = (env.items, np.array([a[0] for a in actions]).T, np.array([a[1] for a in actions]).T)
+    return n_steps / elapsed, episodes
+
+def time_loop(items: np.ndarray, orders: np.ndarray, orientations: np.ndarray, bin_size: Tuple[int] = (100, 100, 100)) -> float:
+    """
+    Place the same episodes one item at a time with Placement.ArrayBin (difference process, one open bin),
+    and return the steps per second.
+    """
+    from problem import Placement
+
+    n_steps, elapsed = 0, 0.0
+    for episode_items, order, episode_orientations in zip(items, orders, orientations):
+        sizes = [Placement.get_size(tuple(episode_items[i].tolist()), int(o)) for i, o in zip(order, episode_orientations)]
+        min_sizes = np.minimum.accumulate(np.min(sizes, axis=1)[::-1])[::-1].tolist()[1:] + [np.inf]
+        start = time.perf_counter()
+        bin = Placement.ArrayBin(bin_size, 'difference')
+        for size, min_size in zip(sizes, min_sizes):
+            EMS = bin.choose(size)
+            if EMS is None:
+                bin = Placement.ArrayBin(bin.size, 'difference')
+                EMS = 0
+            bin.update(size, EMS, min_size)
+        elapsed += time.perf_counter() - start
+        n_steps += len(sizes)
+    return n_steps / elapsed
+
+def benchmark_env(batch_sizes: List[int] = (1, 8, 32, 128, 512), n_items: int = 100, n_episodes: int = 512, n_loop_episodes: int = 64, seed: int = 0) -> None:
+    """
+    Environment steps per second against the batch size, with the same number of episodes at every batch size.
+    - The Python loop places the first n_loop_episodes episodes of the largest batch again, with the same actions.
+    """
+    rates, episodes = {}, None
+    for batch_size in sorted(batch_sizes):
+        rates[batch_size], episodes = time_env(batch_size, n_items, n_episodes, seed)
+    loop_rate = time_loop(*(array[:n_loop_episodes] for array in episodes))
+    print(f'Env | Python loop over Placement.ArrayBin: {loop_rate:>12,.0f} steps/s')
+    for batch_size, rate in rates.items():
+        print(f'Env | batch {batch_size:>5}: {rate:>12,.0f} steps/s ({rate / loop_rate:.1f}x the loop)')
+
+def time_import(module: str = 'model') -> float:
+    """
+    Time the import of a module in a fresh interpreter, after its dependencies (torch) are imported.
+    """
+    code = f'import time, torch; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)'
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join([GENETIC_ALGORITHM, DATA]))
+    output = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)), env=environment, capture_output=True, text=True, check=True)
+    return float(output.stdout.split()[-1])
+
+def benchmark_inference(batch_sizes: List[int] = (1, 32, 256), n_decisions: int = 50, n_threads: int = None, seed: int = 0) -> None:
+    """
+    Latency per decision (building the candidate height maps, scoring them in one forward pass and choosing the best)
+    of each variant of the model, on random candidate boxes over a random height map.
+    """
+    import torch
+    from model import build_model, quantize, export, Scorer
+
+    print(f'Inference | import model.py: {1e3 * time_import():.1f} ms')
+    start = time.perf_counter()
+    model = build_model()
+    print(f'Inference | build model: {1e3 * (time.perf_counter() - start):.1f} ms '
+          f'({sum(parameter.numel() for parameter in model.parameters()) / 1e6:.1f}M parameters)')
+
+    variants = {'eager': model, 'int8': quantize(model)}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'model.pt')
+        export(model, path)
+        variants['torchscript'] = torch.jit.load(path)
+
+    bin_size = (100, 100, 100)
+    rng = np.random.default_rng(seed)
+    height_map = rng.integers(0, 50, size=(32, 32)).astype(np.int16)
+    for batch_size in batch_sizes:
+        corners = rng.integers(0, 50, size=(n_decisions, batch_size, 3))
+        boxes = np.concatenate((corners, corners + rng.integers(1, 50, size=(n_decisions, batch_size, 3))), axis=2)
+        reference = None
+        for name, variant in variants.items():
+            scorer = Scorer(variant, bin_size, n_threads)
+            scorer.choose(height_map, boxes[0]) # Warm-up
+            latencies, choices = [], []
+            for decision in boxes:
+                start = time.perf_counter()
+                choices.append(scorer.choose(height_map, decision))
+                latencies.append(time.perf_counter() - start)
+            reference = choices if reference is None else reference
+            agreement = np.mean(np.array(choices) == np.array(reference))
+            latencies = 1e3 * np.array(latencies)
+            print(f'Inference | {name:>11} | batch {batch_size:>3}: {latencies.mean():.2f} ms per decision '
+                  f'(p50 {np.median(latencies):.2f} ms, {1e3 * latencies.mean() / batch_size:.0f} us per candidate) | '
+                  f'same choice as eager {100 * agreement:.0f}%')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks of the reinforcement learning components')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    env = commands.add_parser('env', help='Environment steps per second against the batch size')
+    env.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32, 128, 512])
+    env.add_argument('--n-items', type=int, default=100)
+    env.add_argument('--n-episodes', type=int, default=512)
+
+    inference = commands.add_parser('inference', help='Latency per decision of the CNN scorer')
+    inference.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 32, 256])
+    inference.add_argument('--n-decisions', type=int, default=50)
+    inference.add_argument('--n-threads', type=int, default=None)
+
+    args = parser.parse_args()
+    if args.command == 'env':
+        benchmark_env(args.batch_sizes, args.n_items, args.n_episodes)
+    else:
+        benchmark_inference(args.batch_sizes, args.n_decisions, args.n_threads)
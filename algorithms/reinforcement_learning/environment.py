@@ -0,0 +1,326 @@
+import numpy as np
+from typing import List, Tuple, Dict
+from heightmap import HeightMaps
+from generator import Generator
+
+"""
+Batched packing environment for reinforcement learning on CPU.
+- B packing episodes are stepped at once: the state of all episodes is held in arrays with a leading batch dimension,
+  and each step is a fixed number of NumPy operations on the whole batch, whatever the batch size.
+- At each step, every episode places one of its remaining items in a chosen orientation (1 to 6, as Placement.get_size).
+- The item is placed in the open bin as Placement does with the array backend and the difference process: among the EMSs that
+  can hold it, the one with the largest Distance to the Front-Top-Right Corner (FTR) is chosen, the first among ties, and
+  the EMSs are updated in the same order as ArrayBin.difference. EMSs smaller than every remaining item are dropped.
+- Each episode has one open bin. When the item fits in no EMS of it, the bin is closed and a new one is opened
+  (as Placement with max_open_bins=1).
+- The reward is -1 whenever a bin is opened, and minus the least load of the bins (as a fraction of the bin volume) at the
+  last step, so the return of an episode is minus the fitness of the genetic algorithm.
+- Items are generated by data/generator.Generator, one instance per episode, or given as an array.
+- heightmap (algorithms/genetic_algorithm) and generator (data) are imported as top-level modules, so their directories must
+  be on the module search path, as benchmark.py sets it up.
+- The batch pays a fixed NumPy overhead per step, so it only beats a Python loop of Placement.ArrayBin bins (one episode at a
+  time, as time_loop in benchmark.py) from about 4 episodes per batch: 0.5x the loop for 1 episode, 0.8x for 2, 1.2x for 4,
+  1.5x for 8 and about 2.3x from 64 episodes, with random actions on 100-item instances. Step fewer episodes with the loop.
+- Actions are NumPy arrays or torch tensors; observations are returned as NumPy arrays, or as torch tensors sharing their
+  memory when the environment is created with tensors=True. torch is only imported in that case.
+
+Observations:
+- items: (B, N, 3) sizes of the items as generated
+- placed: (B, N) items already placed
+- EMSs: (B, K, 6) EMSs (x1, y1, z1, x2, y2, z2) of the open bin, int16 (int32 for bins larger than 32767); only the first
+  n_EMSs rows of each episode are used
+- EMS_mask: (B, K) valid EMSs
+- loads: (B,) load of the open bin
+- used_bins: (B,) number of bins opened
+- height_maps: (B, R, R) int16 height maps of the open bins (see heightmap.py), updated in place at each step; as a tensor,
+  it is the same tensor at every step
+"""
+
+# Axis permutation of each orientation (1 to 6), as Placement.rotations
+ROTATIONS = np.array([[0, 1, 2], [0, 2, 1], [1, 0, 2], [1, 2, 0], [2, 0, 1], [2, 1, 0]])
+
+class PackingEnv:
+    # Largest number of EMS comparisons made by one vectorized operation
+    chunk_elements = 1 << 18
+
+    def __init__(self,
+                 batch_size: int,
+                 n_items: int,
+                 n_bins: int = 1,
+                 bin_size: Tuple[int] = (100, 100, 100),
+                 seed: int = 0,
+                 capacity: int = 32,
+                 resolution: Tuple[int] = (32, 32),
+                 tensors: bool = False):
+        """
+        Parameters:
+        :param batch_size: Number of episodes stepped at once (B)
+        :param n_items: Number of items per generated bin (the episodes have n_items * n_bins items)
+        :param n_bins: Number of bins per generated instance
+        :param bin_size: Size of the bins in 3 dimensions
+        :param seed: Seed of the first generated instance; each reset generates the next batch_size instances
+        :param capacity: Initial number of EMS rows per episode (grown when needed)
+        :param resolution: Resolution of the height maps (that of the CNN policy by default)
+        :param tensors: Return observations and rewards as torch tensors
+        """
+        if batch_size < 1:
+            raise ValueError('Batch size must be a positive integer')
+        self.batch_size = batch_size
+        self.n_items = n_items
+        self.n_bins = n_bins
+        self.bin_size = np.array(bin_size, dtype=np.int32)
+        self.bin_volume = int(np.prod(self.bin_size, dtype=np.int64))
+        self.coordinate_type = np.int16 if self.bin_size.max() <= np.iinfo(np.int16).max else np.int32
+        self.seed = seed
+        self.capacity = capacity
+        self.tensors = tensors
+        self.batch = np.arange(batch_size)
+        self.height_maps = HeightMaps(batch_size, bin_size, resolution)
+
+    def generate(self) -> np.ndarray:
+        """
+        - Generate the items of the next batch_size instances with data/generator.Generator, as a (B, N, 3) array.
+        """
+        items = []
+        for _ in range(self.batch_size):
+            generator = Generator(self.n_items, self.n_bins, seed=self.seed, bin_size=self.bin_size.tolist())
+            generator.build()
+            items.append(generator.samples)
+            self.seed += 1
+        return np.array(items, dtype=np.int32)
+
+    def reset(self, items: np.ndarray = None) -> Dict[str, np.ndarray]:
+        """
+        - Start B new episodes with the given items (B, N, 3), or with newly generated instances.
+        """
+        items = self.generate() if items is None else np.asarray(items, dtype=np.int32)
+        if items.ndim != 3 or items.shape[0] != self.batch_size or items.shape[2] != 3:
+            raise ValueError(f'Items must be an array of shape ({self.batch_size}, N, 3)')
+
+        self.items = items
+        self.total_items = items.shape[1]
+        self.placed = np.zeros(items.shape[:2], dtype=bool)
+        self.min_sizes = items.min(axis=2)
+        self.sizes = items[:, :, ROTATIONS] # (B, N, 6, 3)
+        self.fits = np.all(self.sizes <= self.bin_size, axis=3)
+
+        # No bin is open: the first item opens one
+        self.EMSs = np.zeros((self.batch_size, self.capacity, 6), dtype=self.coordinate_type)
+        self.n_EMSs = np.zeros(self.batch_size, dtype=np.int64)
+        self.loads = np.zeros(self.batch_size, dtype=np.int64)
+        self.least_loads = np.full(self.batch_size, np.iinfo(np.int64).max)
+        self.used_bins = np.zeros(self.batch_size, dtype=np.int64)
+        self.height_maps.reset()
+        self.n_steps = 0
+        return self.observation()
+
+    def EMS_mask(self) -> np.ndarray:
+        return np.arange(self.EMSs.shape[1])[None, :] < self.n_EMSs[:, None]
+
+    def action_mask(self) -> np.ndarray:
+        """
+        - (B, N, 6) mask of the valid actions: remaining items in the orientations that fit in an empty bin.
+        """
+        return self.fits & ~self.placed[:, :, None]
+
+    def observation(self) -> Dict[str, np.ndarray]:
+        observation = {
+            'items': self.items,
+            'placed': self.placed,
+            'EMSs': self.EMSs,
+            'EMS_mask': self.EMS_mask(),
+            'loads': self.loads,
+            'used_bins': self.used_bins
+        }
+        if not self.tensors:
+            observation['height_maps'] = self.height_maps.maps
+            return observation
+        observation = self.to_tensors(observation)
+        observation['height_maps'] = self.height_maps.tensor()
+        return observation
+
+    @staticmethod
+    def to_tensors(arrays: Dict[str, np.ndarray]) -> dict:
+        # torch.from_numpy shares the memory of the arrays, so no data is copied
+        import torch
+        return {name: torch.from_numpy(np.ascontiguousarray(array)) for name, array in arrays.items()}
+
+    @staticmethod
+    def as_array(actions) -> np.ndarray:
+        if hasattr(actions, 'numpy'):
+            actions = actions.detach().cpu().numpy()
+        return np.asarray(actions, dtype=np.int64)
+
+    def choose(self, sizes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        - Return the index of the EMS chosen for each item (B, 3) by the FTR rule, and whether any EMS can hold it.
+        """
+        corners = self.EMSs[:, :, :3] + sizes[:, None, :].astype(self.coordinate_type)
+        candidates = self.EMS_mask() & np.all(corners <= self.EMSs[:, :, 3:], axis=2)
+        distances = np.sum((self.bin_size - corners).astype(np.int64) ** 2, axis=2)
+        distances = np.where(candidates, distances, -1)
+        return np.argmax(distances, axis=1), candidates.any(axis=1)
+
+    def inscribed(self, EMSs1: np.ndarray, EMSs2: np.ndarray) -> np.ndarray:
+        """
+        - inscribed[b, i, j]: EMSs1[b, i] is inscribed in EMSs2[b, j].
+        - Each coordinate is compared as one contiguous column, in the narrowest integer type that holds the bin.
+        """
+        columns1 = np.ascontiguousarray(EMSs1.transpose(2, 0, 1), dtype=self.coordinate_type)
+        columns2 = np.ascontiguousarray(EMSs2.transpose(2, 0, 1), dtype=self.coordinate_type)
+        result = columns1[0][:, :, None] >= columns2[0][:, None, :]
+        for axis in range(3):
+            if axis:
+                result &= columns1[axis][:, :, None] >= columns2[axis][:, None, :]
+            result &= columns1[3 + axis][:, :, None] <= columns2[3 + axis][:, None, :]
+        return result
+
+    @staticmethod
+    def compact(rows: np.ndarray, mask: np.ndarray, width: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        - Move the rows of each episode selected by the mask to the front, in order, and drop the columns no episode uses
+          (keeping at least width columns).
+        - Return the rows and their mask.
+        """
+        counts = mask.sum(axis=1)
+        episodes = np.nonzero(mask)[0]
+        positions = np.arange(len(episodes)) - (np.cumsum(counts) - counts)[episodes]
+        compacted = np.zeros((len(mask), max(int(counts.max()), width), rows.shape[2]), dtype=rows.dtype)
+        compacted[episodes, positions] = rows[mask]
+        return compacted, np.arange(compacted.shape[1])[None, :] < counts[:, None]
+
+    def chunks(self, n_children: np.ndarray, n_kept: np.ndarray) -> List[np.ndarray]:
+        """
+        - Group the episodes into chunks compared in one vectorized operation each.
+        - Episodes are sorted by their number of comparisons, so each chunk is padded to sizes close to those of its episodes,
+          and a chunk holds at most chunk_elements comparisons, so its temporaries stay in the CPU cache.
+        """
+        costs = n_children * np.maximum(n_kept, n_children)
+        order = np.argsort(costs, kind='stable')
+        chunks, start = [], 0
+        for end, cost in enumerate(costs[order].tolist(), 1):
+            if end - start > 1 and (end - start) * cost > self.chunk_elements:
+                chunks.append(order[start:end - 1])
+                start = end - 1
+        chunks.append(order[start:])
+        return [chunk for chunk in chunks if costs[chunk[-1]] > 0]
+
+    def difference(self, boxes: np.ndarray, min_sizes: np.ndarray) -> None:
+        """
+        - Difference process of the placed boxes (B, 6) in the open bins, as ArrayBin.difference for each episode.
+        - Each episode is padded to the largest number of EMSs (or of new EMSs) in the batch, with a mask of its own rows.
+        - A child lies against one face of the box and overlaps the box along the two other axes, so a kept EMS containing it
+          is separated from the box along the remaining axis, against the same face. Only the kept EMSs touching the box are
+          compared with the children.
+        """
+        EMSs, valid = self.EMSs, self.EMS_mask()
+        boxes = boxes.astype(self.coordinate_type)
+        hit = valid.copy()
+        touching = np.zeros_like(valid)
+        for axis in range(3):
+            hit &= EMSs[:, :, axis] < boxes[:, None, 3 + axis]
+            hit &= EMSs[:, :, 3 + axis] > boxes[:, None, axis]
+            touching |= (EMSs[:, :, 3 + axis] == boxes[:, None, axis]) | (EMSs[:, :, axis] == boxes[:, None, 3 + axis])
+        kept = valid & ~hit
+
+        # Each intersected EMS gives 6 children: below and above the box along each axis
+        parents, parent_mask = self.compact(EMSs, hit)
+        children = np.repeat(parents[:, :, None, :], 6, axis=2)
+        for axis in range(3):
+            children[:, :, 2 * axis, 3 + axis] = boxes[:, None, axis]
+            children[:, :, 2 * axis + 1, axis] = boxes[:, None, 3 + axis]
+        children = children.reshape(self.batch_size, -1, 6)
+        extents = np.min(children[:, :, 3:] - children[:, :, :3], axis=2)
+        child_mask = np.repeat(parent_mask, 6, axis=1) & (extents >= np.maximum(min_sizes, 1)[:, None])
+        children, child_mask = self.compact(children, child_mask)
+
+        kept_EMSs, kept_mask = self.compact(EMSs, kept & touching)
+        valid_children = child_mask.copy()
+        for episodes in self.chunks(child_mask.sum(axis=1), kept_mask.sum(axis=1)):
+            n_children = int(child_mask[episodes[-1]].sum()) if len(episodes) == 1 else int(child_mask[episodes].sum(axis=1).max())
+            n_kept = int(kept_mask[episodes].sum(axis=1).max())
+            part_children, part_mask = children[episodes, :n_children], child_mask[episodes, :n_children]
+            inside = self.inscribed(part_children, kept_EMSs[episodes, :n_kept]) & kept_mask[episodes, None, :n_kept]
+            part_valid = part_mask & ~inside.any(axis=2)
+
+            # contained[b, i, j]: child i is inscribed in child j; among identical children only the first one is kept
+            contained = self.inscribed(part_children, part_children) & part_mask[:, None, :]
+            order = np.arange(n_children)
+            dominated = contained & (~contained.transpose(0, 2, 1) | (order[None, :] < order[:, None]))
+            dominated[:, order, order] = False
+            valid_children[episodes, :n_children] = part_valid & ~dominated.any(axis=2)
+
+        # The kept EMSs come first, then the new ones
+        self.EMSs, mask = self.compact(np.concatenate((EMSs, children), axis=1), np.concatenate((kept, valid_children), axis=1), self.capacity)
+        self.n_EMSs = mask.sum(axis=1)
+
+    def step(self, items, orientations) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        - Place one item in each episode and return the observation, the rewards, whether the episodes are done and an info
+          dict with the placed boxes (B, 6) and their bin index.
+
+        Parameters:
+        :param items: (B,) index of the item placed in each episode
+        :param orientations: (B,) orientation of each item (1 to 6)
+        """
+        items, orientations = self.as_array(items), self.as_array(orientations)
+        if self.n_steps == self.total_items:
+            raise ValueError('Episodes are done: reset the environment')
+        if np.any(self.placed[self.batch, items]):
+            raise ValueError('An item can only be placed once')
+        if np.any((orientations < 1) | (orientations > 6)):
+            raise ValueError('Orientations must be between 1 and 6')
+        if not np.all(self.fits[self.batch, items, orientations - 1]):
+            raise ValueError('An item does not fit in an empty bin in the chosen orientation')
+
+        sizes = self.sizes[self.batch, items, orientations - 1]
+        self.placed[self.batch, items] = True
+        # The smallest dimension of the remaining items: smaller EMSs can never be used again
+        min_sizes = np.where(self.placed, np.iinfo(np.int32).max, self.min_sizes).min(axis=1)
+
+        rewards = np.zeros(self.batch_size)
+        indices, fits = self.choose(sizes)
+        opened = ~fits
+        if opened.any():
+            closed = opened & (self.used_bins > 0)
+            self.least_loads[closed] = np.minimum(self.least_loads[closed], self.loads[closed])
+            self.EMSs[opened] = 0
+            self.EMSs[opened, 0, 3:] = self.bin_size
+            self.n_EMSs[opened] = 1
+            self.loads[opened] = 0
+            self.used_bins[opened] += 1
+            self.height_maps.reset(opened)
+            indices[opened] = 0
+            rewards[opened] -= 1
+
+        corners = self.EMSs[self.batch, indices, :3]
+        boxes = np.concatenate((corners, corners + sizes), axis=1)
+        self.loads += np.prod(sizes, axis=1, dtype=np.int64)
+        self.difference(boxes, min_sizes)
+        self.height_maps.update(boxes)
+        self.n_steps += 1
+
+        done = np.full(self.batch_size, self.n_steps == self.total_items)
+        if self.n_steps == self.total_items:
+            rewards -= np.minimum(self.least_loads, self.loads) / self.bin_volume
+
+        info = {'boxes': boxes, 'bins': self.used_bins - 1}
+        if self.tensors:
+            info = self.to_tensors(info)
+            import torch
+            return self.observation(), torch.from_numpy(rewards), torch.from_numpy(done), info
+        return self.observation(), rewards, done, info
+
+if 11 < 3:
+    env = PackingEnv(batch_size=4, n_items=20)
+    observation = env.reset()
+    total_rewards = np.zeros(env.batch_size)
+    for _ in range(env.total_items):
+        # Place the largest remaining item in its first valid orientation
+        mask = env.action_mask()
+        volumes = np.where(mask.any(axis=2), env.items.prod(axis=2), -1)
+        items = volumes.argmax(axis=1)
+        orientations = mask[env.batch, items].argmax(axis=1) + 1
+        observation, rewards, done, info = env.step(items, orientations)
+        total_rewards += rewards
+    print(f'Returns: {total_rewards} | Used bins: {observation["used_bins"]}')
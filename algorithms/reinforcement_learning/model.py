@@ -1,6 +1,20 @@
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
+from typing import Tuple, Union
+from heightmap import HeightMaps
+
+"""
+CNN policy on the height map of a bin.
+- The CNN has about 16.8M parameters (fc1 alone is 64 * 32 * 32 x 256), so nothing is built at import time: build_model does.
+- Scorer scores a batch of candidate placements in one forward pass under torch.inference_mode. Each candidate is given by the
+  height map of the bin after the placement, and its score is the output of the critic.
+- For CPU-only deployment, the model can be quantized to int8 (dynamic quantization of the linear layers, which hold almost
+  all the weights) or exported to TorchScript, which runs without the Python class.
+- heightmap is imported from algorithms/genetic_algorithm as a top-level module, so that directory must be on the module
+  search path (see benchmark.py).
+"""
 
 class CNN(nn.Module):
     def __init__(self):
@@ -29,9 +43,67 @@ class CNN(nn.Module):
         
         return actor_output, critic_output, predictor_output
     
-model = CNN()
-sample_input = torch.randn(1, 1, 32, 32) # Batch size = 1, 1 channel, 32x32 height map
-actor_output, critic_output, predictor_output = model(sample_input)
+def build_model(path: str = None) -> CNN:
+    """
+    - Build the CNN in evaluation mode, with the weights of a saved state dict if a path is given.
+    """
+    model = CNN()
+    if path is not None:
+        model.load_state_dict(torch.load(path, map_location='cpu'))
+    return model.eval()
+
+def quantize(model: nn.Module) -> nn.Module:
+    """
+    - int8 dynamic quantization of the linear layers: weights are stored as int8 and activations quantized on the fly.
+    """
+    return torch.ao.quantization.quantize_dynamic(model.eval(), {nn.Linear}, dtype=torch.qint8)
+
+def export(model: nn.Module, path: str, resolution: Tuple[int] = (32, 32)) -> None:
+    """
+    - Trace the model on a height map of the given resolution, freeze it and save it as TorchScript (load with torch.jit.load).
+    """
+    with torch.inference_mode():
+        traced = torch.jit.trace(model.eval(), torch.zeros(1, 1, *resolution))
+    torch.jit.freeze(traced).save(path)
+
+class Scorer:
+    def __init__(self, model: nn.Module, bin_size: Tuple[int], n_threads: int = None):
+        """
+        Parameters:
+        :param model: CNN, quantized CNN or TorchScript module returning (actor, critic, predictor) outputs
+        :param bin_size: Size of the bins: heights are divided by the bin height
+        :param n_threads: Number of threads of torch on CPU (left unchanged if None)
+        """
+        self.model = model.eval()
+        self.bin_size = tuple(bin_size)
+        if n_threads is not None:
+            torch.set_num_threads(n_threads)
+
+    def candidate_maps(self, height_map: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        """
+        - The height maps (n, R, R) of a bin after each of n candidate placements boxes (n, 6) from its height map (R, R).
+        """
+        boxes = np.asarray(boxes).reshape(-1, 6)
+        maps = HeightMaps(len(boxes), self.bin_size, height_map.shape)
+        maps.maps[:] = height_map
+        maps.update(boxes)
+        return maps.maps
+
+    def score(self, height_maps: Union[np.ndarray, torch.Tensor]) -> torch.Tensor:
+        """
+        - Score a batch of height maps (n, R, R) in one forward pass and return the critic output of each (n,).
+        """
+        height_maps = torch.as_tensor(height_maps)
+        with torch.inference_mode():
+            inputs = height_maps.unsqueeze(1).to(torch.float32) / self.bin_size[2]
+            _, critic_output, _ = self.model(inputs)
+            return critic_output[:, 0]
+
+    def choose(self, height_map: np.ndarray, boxes: np.ndarray) -> int:
+        """
+        - Return the index of the candidate placement with the highest score.
+        """
+        return int(torch.argmax(self.score(self.candidate_maps(height_map, boxes))))
 
 class Actor:
     pass
@@ -40,4 +112,14 @@ class Critic:
     pass
 
 class Predictor:
-    pass
\ No newline at end of file
+    pass
+
+if 11 < 3:
+    model = build_model()
+    sample_input = torch.randn(1, 1, 32, 32) # Batch size = 1, 1 channel, 32x32 height map
+    actor_output, critic_output, predictor_output = model(sample_input)
+
+    scorer = Scorer(quantize(model), (100, 100, 100))
+    height_map = np.zeros((32, 32), dtype=np.int16)
+    boxes = np.array([[0, 0, 0, 50, 50, 30], [50, 0, 0, 100, 40, 20], [0, 0, 0, 100, 100, 10]])
+    print(f'Scores: {scorer.score(scorer.candidate_maps(height_map, boxes))} | Chosen: {scorer.choose(height_map, boxes)}')
@@ -0,0 +1,170 @@
+import os
+import json
+import argparse
+import itertools
+import numpy as np
+import multiprocessing as mp
+
+from typing import List, Tuple, Dict, Iterator
+from generator import Generator
+
+"""
+Bulk generation of instances into sharded archives.
+- A grid of (n_items, n_bins, bin_size, seed) parameters is generated in a process pool. Each instance is generated with its own
+  seed, exactly as Generator(n_items, n_bins, seed=seed, bin_size=bin_size) would, so the result does not depend on the pool.
+- Instances are written in grid order into .npz shards of at most shard_size instances, one array of items per instance.
+- An index (index.json) records the shard, the key and the parameters of each instance, so a single instance can be read back
+  without loading the rest of its shard.
+- Each instance records the number of bins it was built from (optimal_bins) and its volume lower bound. The items fit in
+  optimal_bins bins by construction, and this count is proven optimal whenever the volume bound reaches it.
+"""
+
+INDEX = 'index.json'
+
+def grid(n_items: List[int], n_bins: List[int], bin_sizes: List[Tuple[int]], seeds: range) -> List[dict]:
+    return [
+        {'n_items': items, 'n_bins': bins, 'bin_size': list(bin_size), 'seed': seed}
+        for items, bins, bin_size, seed in itertools.product(n_items, n_bins, bin_sizes, seeds)
+    ]
+
+def build(parameters: dict) -> Tuple[dict, np.ndarray]:
+    """
+    Generate one instance and return its metadata and its items as an int32 array of shape (n_bins * n_items, 3).
+    """
+    generator = Generator(parameters['n_items'], parameters['n_bins'], seed=parameters['seed'], bin_size=parameters['bin_size'], filename='')
+    generator.build()
+    metadata = dict(parameters,
+                    n_samples=generator.n_samples,
+                    total_volume=generator.total_volume,
+                    optimal_bins=generator.n_bins,
+                    volume_bound=generator.volume_bound)
+    return metadata, np.array(generator.samples, dtype=np.int32)
+
+def write_shard(path: str, arrays: Dict[str, np.ndarray]) -> None:
+    # Written to a temporary file first, so an interrupted run never leaves a truncated shard behind
+    with open(path + '.tmp', 'wb') as file:
+        np.savez(file, **arrays)
+    os.replace(path + '.tmp', path)
+
+def generate(output_dir: str,
+             instances: List[dict],
+             shard_size: int = 1000,
+             n_workers: int = None,
+             chunk_size: int = 16) -> List[dict]:
+    """
+    Generate the instances in a process pool and write them into shards with an index.
+
+    Parameters:
+    :param output_dir: Directory of the shards and of the index
+    :param instances: Parameters of each instance (see grid)
+    :param shard_size: Maximum number of instances per shard
+    :param n_workers: Number of processes of the pool (defaults to the number of CPUs)
+    :param chunk_size: Number of instances sent to a process at once
+    """
+    if shard_size < 1:
+        raise ValueError('Shard size must be a positive integer')
+    os.makedirs(output_dir, exist_ok=True)
+
+    index, shards, arrays = [], [], {}
+    def flush() -> None:
+        if arrays:
+            shard = f'shard_{len(shards):05d}.npz'
+            write_shard(os.path.join(output_dir, shard), arrays)
+            shards.append(shard)
+            arrays.clear()
+
+    with mp.Pool(n_workers) as pool:
+        # imap keeps the grid order, so the shards are the same for any number of workers
+        for i, (metadata, items) in enumerate(pool.imap(build, instances, chunksize=chunk_size)):
+            key = f'items_{i}'
+            arrays[key] = items
+            index.append(dict(metadata, shard=len(shards), key=key))
+            if len(arrays) == shard_size:
+                flush()
+        flush()
+
+    with open(os.path.join(output_dir, INDEX), 'w') as file:
+        json.dump({'shards': shards, 'instances': index}, file)
+    return index
+
+class Instance:
+    def __init__(self, metadata: dict, items: np.ndarray):
+        self.metadata = metadata
+        self.items = items
+        self.bin_size: List[int] = metadata['bin_size']
+        self.n_bins: int = metadata['n_bins']
+        self.n_items: int = metadata['n_items']
+        self.total_volume: int = metadata['total_volume']
+        self.optimal_bins: int = metadata['optimal_bins']
+        self.volume_bound: int = metadata['volume_bound']
+
+    def write(self, filename: str) -> None:
+        """
+        Write the instance in the text format of Generator.
+        """
+        with open(filename, 'w') as file:
+            file.write(f'Bin size: {self.bin_size[0]} {self.bin_size[1]} {self.bin_size[2]}\n')
+            file.write(f'Number of bins: {self.n_bins}\n')
+            file.write(f'Number of items per bin: {self.n_items}\n')
+            file.write(f'Total volume of items: {self.total_volume}\n')
+            file.write('Items:\n')
+            for x, y, z in self.items.tolist():
+                file.write(f'{x} {y} {z}\n')
+
+class Dataset:
+    """
+    Lazy reader of sharded instances: shards are opened on first use, and only the items of the requested instance are read.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX)) as file:
+            index = json.load(file)
+        self.shards: List[str] = index['shards']
+        self.index: List[dict] = index['instances']
+        self.files: Dict[int, np.lib.npyio.NpzFile] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, i: int) -> Instance:
+        metadata = self.index[i]
+        shard = metadata['shard']
+        if shard not in self.files:
+            self.files[shard] = np.load(os.path.join(self.directory, self.shards[shard]))
+        return Instance(metadata, self.files[shard][metadata['key']])
+
+    def __iter__(self) -> Iterator[Instance]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def select(self, **parameters) -> List[int]:
+        """
+        Return the indices of the instances matching all the given parameters, e.g. select(n_items=200, n_bins=5).
+        """
+        return [i for i, metadata in enumerate(self.index) if all(metadata[key] == value for key, value in parameters.items())]
+
+    def close(self) -> None:
+        for file in self.files.values():
+            file.close()
+        self.files.clear()
+
+    def __enter__(self) -> 'Dataset':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate instances in bulk into sharded archives')
+    parser.add_argument('output_dir')
+    parser.add_argument('--n-items', type=int, nargs='+', default=[50, 200])
+    parser.add_argument('--n-bins', type=int, nargs='+', default=[1, 5])
+    parser.add_argument('--bin-size', type=int, nargs=3, action='append', help='Can be given several times (default: 100 100 100)')
+    parser.add_argument('--seeds', type=int, nargs=2, default=[0, 100], metavar=('START', 'STOP'))
+    parser.add_argument('--shard-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    instances = grid(args.n_items, args.n_bins, args.bin_size or [[100, 100, 100]], range(*args.seeds))
+    index = generate(args.output_dir, instances, args.shard_size, args.workers)
+    print(f'Generated {len(index)} instances into {index[-1]["shard"] + 1 if index else 0} shards in {args.output_dir}')
@@ -1,10 +1,12 @@
 import os
+import sys
+import heapq
 import random
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 from typing import List, Tuple
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+# Directory of render.py, which draws the items
+GENETIC_ALGORITHM = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'algorithms', 'genetic_algorithm')
 
 class Generator:
     def __init__(self, n_items: int, n_bins: int = 1, seed: int = 0, bin_size: List[int] = [100, 100, 100], **kwargs):
@@ -26,6 +28,7 @@ class Generator:
         self.bin_size: List[int] = bin_size
         self.items: List[List[Tuple[List[int], List[int]]]] = []
         self.flat_items: List[Tuple[List[int], List[int]]] = None
+        self.samples: List[List[int]] = None
         self.total_volume: int = 0
 
         if 'n_samples' in kwargs:
@@ -45,25 +48,36 @@ class Generator:
         """
         Generate random items for all bins and write them to a file.
         """
+        self.build()
+        self.write()
+
+    def build(self) -> None:
+        """
+        Generate random items for all bins, without writing them.
+        - self.samples holds the written size of each item: its dimensions in a random order, in the order of the file.
+        """
         def generate_for_bin(bin_origin: List[int]) -> List[Tuple[List[int], List[int]]]:
             """
             Generate random items for a single bin.
             - We will generate items by recursively splitting the bin into 2 parts along the largest dimension.
             - We also keep track of the origin of each item (coordinates of the left-bottom-back corner) for visualization.
+            - The largest item is split first, and among items of equal volume the most recently created one. Items are kept
+              in a heap keyed on (-volume, -creation index), so each cut costs O(log n).
             """
-            items = [(bin_origin, self.bin_size[:])]
             bin_volume = self.bin_size[0] * self.bin_size[1] * self.bin_size[2]
+            heap = [(-bin_volume, 0, bin_origin, self.bin_size[:])]
+            count = 1
 
             for _ in range(self.n_items + self.n_samples - 1):
-                (origin, item) = items.pop()
+                (_, _, origin, item) = heap[0]
                 
                 # Choose the dimension with the largest size to split
                 dimension: int = item.index(max(item))
                 size: int = item[dimension]
                 
                 if size == 1:
-                    items.append((origin, item))
                     continue
+                heapq.heappop(heap)
                 
                 # Randomly choose a cut point
                 cut_point: int = random.randint(1, size - 1)
@@ -79,12 +93,13 @@ class Generator:
                 new_origin2: List[int] = origin[:]
                 new_origin2[dimension] += cut_point
                 
-                # Add new items to the list
-                items.append((new_origin1, new_item1))
-                items.append((new_origin2, new_item2))
-                items.sort(key=lambda x: x[1][0] * x[1][1] * x[1][2])
+                # Add new items to the heap
+                heapq.heappush(heap, (-new_item1[0] * new_item1[1] * new_item1[2], -count, new_origin1, new_item1))
+                heapq.heappush(heap, (-new_item2[0] * new_item2[1] * new_item2[2], -count - 1, new_origin2, new_item2))
+                count += 2
 
-            # Sort items by height to remove some topmost items
+            # Sort items by volume, then by height to remove some topmost items
+            items = [(origin, item) for (_, _, origin, item) in sorted(heap, key=lambda x: (-x[0], -x[1]))]
             items.sort(key=lambda x: x[0][2])
             for _ in range(self.n_samples):
                 item = items.pop()
@@ -109,9 +124,29 @@ class Generator:
         # Flatten the list of items and reorder randomly
         self.flat_items = [item for bin_items in self.items for item in bin_items]
         random.shuffle(self.flat_items)
-        
+
+        # Randomly rotate each item
+        self.samples = [random.sample(item, 3) for (_, item) in self.flat_items]
+
+    @property
+    def volume_bound(self) -> int:
+        """
+        Lower bound on the number of bins: ceil(total volume / bin volume).
+        - The items fit in n_bins bins by construction, so n_bins is optimal whenever this bound reaches it.
+        """
+        bin_volume = self.bin_size[0] * self.bin_size[1] * self.bin_size[2]
+        return -(-self.total_volume // bin_volume)
+
+    def write(self) -> None:
+        """
+        Write the generated items to the file.
+        """
+        if self.samples is None:
+            raise ValueError('Items have not been generated yet')
+
         # Ensure the directory exists
-        os.makedirs(os.path.dirname(f'Data/Dataset/'), exist_ok=True)
+        if os.path.dirname(self.filename):
+            os.makedirs(os.path.dirname(self.filename), exist_ok=True)
 
         # Write data to file
         with open(self.filename, 'w') as file:
@@ -120,68 +155,33 @@ class Generator:
             file.write(f'Number of items per bin: {self.n_items}\n')
             file.write(f'Total volume of items: {self.total_volume}\n')
             file.write('Items:\n')
-            for (_, item) in self.flat_items:
-                sample = random.sample(item, 3)
+            for sample in self.samples:
                 file.write(f'{sample[0]} {sample[1]} {sample[2]}\n')
     
-    def visualize(self) -> None:
+    def visualize(self, path: str = None, max_items: int = None) -> None:
         """
-        Visualize the generated items in a 3D plot.
+        Visualize the generated items in a 3D plot, with the renderer of the genetic algorithm (render.py).
+        - With a path, the figure is saved (format from the extension) without opening a window.
+        - With max_items, only the largest items are drawn.
+        - matplotlib is only imported here.
         """
-        def plot_box(ax, x0: int, y0: int, z0: int, dx: int, dy: int, dz: int, color) -> None:
-            vertices = [
-                [x0, y0, z0], [x0 + dx, y0, z0], [x0 + dx, y0 + dy, z0], [x0, y0 + dy, z0],
-                [x0, y0, z0 + dz], [x0 + dx, y0, z0 + dz], [x0 + dx, y0 + dy, z0 + dz], [x0, y0 + dy, z0 + dz]
-            ]
-            
-            faces = [
-                [vertices[j] for j in [0, 1, 5, 4]],
-                [vertices[j] for j in [7, 6, 2, 3]],
-                [vertices[j] for j in [0, 3, 7, 4]],
-                [vertices[j] for j in [1, 2, 6, 5]],
-                [vertices[j] for j in [0, 1, 2, 3]],
-                [vertices[j] for j in [4, 5, 6, 7]]
-            ]
-            
-            ax.add_collection3d(Poly3DCollection(faces, facecolors=color, linewidths=.3, edgecolors='k', alpha=.5, zsort='min'))
+        import numpy as np
+        if GENETIC_ALGORITHM not in sys.path:
+            sys.path.append(GENETIC_ALGORITHM)
+        from render import render
 
         if not self.items:
             raise ValueError('Items have not been generated yet')
 
-        fig = plt.figure(figsize=(9, 5))
-        ax = fig.add_subplot(111, projection='3d')
-
-        # Create a color palette for items
-        colors = sns.color_palette("pastel", len(self.flat_items))
-
-        for i, (origin, item) in enumerate(self.flat_items):
-            x0, y0, z0 = origin
-            dx, dy, dz = item
-            color = colors[i % len(colors)]
-            plot_box(ax, x0, y0, z0, dx, dy, dz, color)
-
-        ax.set_xlabel('X')
-        ax.set_ylabel('Y')
-        ax.set_zlabel('Z')
-
-        # Set limits for the axes
-        ax.set_xlim([0, self.bin_size[0] * self.n_bins])
-        ax.set_ylim([0, self.bin_size[1]])
-        ax.set_zlim([0, self.bin_size[2]])
-
-        ax.title.set_text(f'3D Bin Packing Visualization')
-        ax.set_box_aspect([self.bin_size[0] * self.n_bins, self.bin_size[1], self.bin_size[2]])
-        
-        # Add a legend with information
+        # Rows (x1, y1, z1, x2, y2, z2) of all items
+        boxes = np.array([origin + [o + d for o, d in zip(origin, item)] for (origin, item) in self.flat_items], dtype=float)
         info_text = (
             f'Bin size: {self.bin_size}\n'
             f'Number of bins: {self.n_bins}\n'
             f'Number of items per bin: {self.n_items}\n'
             f'Total volume of items: {self.total_volume}'
         )
-        plt.figtext(.8, .5, info_text, fontsize=8, ha='left', va='center', bbox=dict(facecolor='white', edgecolor='black'))
-
-        plt.show()
+        render(boxes, self.bin_size, self.n_bins, path, info_text=info_text, palette_name='pastel', alpha=.5, linewidth=.3, max_boxes=max_items)
 
     def delete(self) -> None:
         """